@@ -32,6 +32,16 @@ def get_faction_wars_rating(label: str) -> FactionWarsRating:
 @dataclass
 class CoreRatings:
     __slots__ = ('demon_lord', 'hydra', 'waves', 'chimera', 'amius', 'chimera_trials', 'sintranos_hard_stages')
+    CATEGORY = 'Core Areas'
+    FIELDS = (
+        ('Demon Lord', 'demon_lord'),
+        ('Hydra', 'hydra'),
+        ('Waves', 'waves'),
+        ('Chimera', 'chimera'),
+        ('Amius', 'amius'),
+        ('Chimera Trials', 'chimera_trials'),
+        ('Sintranos Hard Stages', 'sintranos_hard_stages'),
+    )
     demon_lord: float
     hydra: float
     waves: float
@@ -85,6 +95,16 @@ class CoreRatings:
 @dataclass    
 class DungeonRatings:
     __slots__ = ('spider', 'fire_knight', 'dragon', 'ice_golem', 'iron_twins', 'sand_devil', 'shogun_grove')
+    CATEGORY = 'Dungeons'
+    FIELDS = (
+        ('Spider', 'spider'),
+        ('Fire Knight', 'fire_knight'),
+        ('Dragon', 'dragon'),
+        ('Ice Golem', 'ice_golem'),
+        ('Iron Twins', 'iron_twins'),
+        ('Sand Devil', 'sand_devil'),
+        ('Shogun Grove', 'shogun_grove'),
+    )
     spider: float
     fire_knight: float
     dragon: float
@@ -138,6 +158,13 @@ class DungeonRatings:
 @dataclass
 class HardModeRatings:
     __slots__ = ('spider', 'fire_knight', 'dragon', 'ice_golem')
+    CATEGORY = 'Hard Mode'
+    FIELDS = (
+        ('Spider', 'spider'),
+        ('Fire Knight', 'fire_knight'),
+        ('Dragon', 'dragon'),
+        ('Ice Golem', 'ice_golem'),
+    )
     spider: float
     fire_knight: float
     dragon: float
@@ -176,6 +203,17 @@ class HardModeRatings:
 @dataclass
 class DoomTowerRatings:
     __slots__ = ('magma_dragon', 'nether_spider', 'celestial_griffin', 'dreadhorn', 'scarab_king', 'frost_spider', 'eternal_dragon', 'dark_fae')
+    CATEGORY = 'Doom Tower'
+    FIELDS = (
+        ('Magma Dragon', 'magma_dragon'),
+        ('Nether Spider', 'nether_spider'),
+        ('Celestial Griffin', 'celestial_griffin'),
+        ('Dreadhorn', 'dreadhorn'),
+        ('Scarab King', 'scarab_king'),
+        ('Frost Spider', 'frost_spider'),
+        ('Eternal Dragon', 'eternal_dragon'),
+        ('Dark Fae', 'dark_fae'),
+    )
     magma_dragon: float
     nether_spider: float
     celestial_griffin: float
@@ -283,9 +321,16 @@ class ChampionRatings:
     hard_mode: HardModeRatings
     doom_tower: DoomTowerRatings
     #faction_wars: FactionWarsRatings
+    SECTIONS = (
+        ('core', CoreRatings),
+        ('dungeons', DungeonRatings),
+        ('hard_mode', HardModeRatings),
+        ('doom_tower', DoomTowerRatings),
+    )
 
     def __init__(self, overall=0.0, book=0, core=None, dungeons=None, hard_mode=None, doom_tower=None, faction_wars=None):
         self.overall = overall
+        self.book = book
         self.core = core if core is not None else CoreRatings()
         self.dungeons = dungeons if dungeons is not None else DungeonRatings()
         self.hard_mode = hard_mode if hard_mode is not None else HardModeRatings()
@@ -295,13 +340,27 @@ class ChampionRatings:
     def toJson(self, as_dict=False):
         data = {
             'Overall Rating': self.overall,
-            'Book Value': self.book,
-            'Core Areas': self.core.toJson(as_dict=True),
-            'Dungeons': self.dungeons.toJson(as_dict=True),
-            'Hard Mode': self.hard_mode.toJson(as_dict=True),
-            'Doom Tower': self.doom_tower.toJson(as_dict=True)
+            'Book Value': self.book
         }
+        for attr, section in self.SECTIONS:
+            ratings = getattr(self, attr)
+            data[section.CATEGORY] = ratings.toJson(as_dict=True) if ratings is not None else None
         return data if as_dict else json.dumps(data, cls=CustomEncoder, indent=4)
+
+    def toRows(self):
+        # Flat (category, subcategory, rating) rows in RATING_COLUMNS order.
+        # Scalar ratings go under the "Overall" category, matching how the sinks have always stored them.
+        # Anything left as None (a partial scrape) is omitted so the sinks keep their stored values.
+        rows = [
+            ('Overall', label, value)
+            for label, value in (('Overall Rating', self.overall), ('Book Value', self.book)) if value is not None
+        ]
+        for attr, section in self.SECTIONS:
+            ratings = getattr(self, attr)
+            if ratings is None:
+                continue
+            rows.extend((section.CATEGORY, label, getattr(ratings, field)) for label, field in section.FIELDS)
+        return rows
     
     def __str__(self):
         return self.toJson()
@@ -334,3 +393,30 @@ class Champion:
     
     def __str__(self):
         return self.toJson()
+
+    def toRecord(self):
+        # Builds the payload every sink consumes in one pass: identity fields plus flat rating rows.
+        return {
+            'Name': self.name,
+            'Faction': self.faction,
+            'Affinity': self.affinity,
+            'Rarity': self.rarity,
+            'Rows': self.ratings.toRows()
+        }
+
+# Every (category, subcategory) pair a Champion carries, in toRows() order.
+RATING_COLUMNS = [('Overall', 'Overall Rating'), ('Overall', 'Book Value')] + [
+    (section.CATEGORY, label) for _, section in ChampionRatings.SECTIONS for label, _ in section.FIELDS
+]
+
+def flatten_ratings(ratings_data):
+    # Converts the nested toJson(as_dict=True)["Ratings"] shape into toRows() rows.
+    rows = []
+    for category, subcategories in ratings_data.items():
+        if subcategories is None:  # Not scraped (partial scrape)
+            continue
+        if isinstance(subcategories, dict):  # Nested categories
+            rows.extend((category, subcategory, rating) for subcategory, rating in subcategories.items())
+        else:  # Direct category ratings (Overall Rating, Book Value)
+            rows.append(("Overall", category, subcategories))
+    return rows
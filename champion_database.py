@@ -1,10 +1,47 @@
+import hashlib
+import itertools
+import os
+import pathlib
 import sqlite3
+from datetime import datetime, timezone
+import champion
+import champion_names
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _filter_champions(query, params, faction, affinity, rarity):
+    for column, value in (("faction", faction), ("affinity", affinity), ("rarity", rarity)):
+        if value:
+            query += f" AND champions.{column} = ?"
+            params.append(value)
+    return query, params
+
+# Ratings from this site overwrite any other source's; see save_rows().
+PRIMARY_SOURCE = "hellhades"
+
+# Leaderboard scopes and the champions column each one partitions by ('' puts everyone in one group).
+LEADERBOARD_SCOPES = (
+    ("all", "''"),
+    ("rarity", "COALESCE(champions.rarity, '')"),
+    ("affinity", "COALESCE(champions.affinity, '')"),
+)
 
 class ChampionDatabase:
-    def __init__(self, db_name="champions.db"):
-        self.conn = sqlite3.connect(db_name)
+    def __init__(self, db_name="champions.db", read_only=False):
+        self.db_name = db_name
+        if read_only:
+            # Readers never create tables or take write locks.
+            # as_uri() percent-encodes '?', '#' and '%', which would otherwise be read as URI syntax.
+            self.conn = sqlite3.connect(f"{pathlib.Path(db_name).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            # WAL lets the query service read while scrapers write, and several worker processes share the file.
+            self.conn = sqlite3.connect(db_name, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
         self.cursor = self.conn.cursor()
-        self.create_tables()
+        self.run_id = None
+        if not read_only:
+            self.create_tables()
 
     def create_tables(self):
         """Creates all necessary tables for champion data."""
@@ -24,65 +61,490 @@ class ChampionDatabase:
                 category TEXT NOT NULL,
                 subcategory TEXT NOT NULL,
                 rating REAL,
+                source TEXT,
                 FOREIGN KEY(champion_id) REFERENCES champions(champion_id)
                 UNIQUE(champion_id, category, subcategory) ON CONFLICT REPLACE
             )
         """)
-        
+        # The site each rating came from (NULL for rows saved before sources were recorded, i.e. HellHades)
+        if "source" not in [row[1] for row in self.cursor.execute("PRAGMA table_info(ratings)")]:
+            self.cursor.execute("ALTER TABLE ratings ADD COLUMN source TEXT")
+
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_ratings_leaderboard ON ratings(category, subcategory, rating DESC)")
+
+        # One row per scrape run; rating_history only receives values that differ from the previous run.
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT NOT NULL,
+                finished_at TEXT
+            )
+        """)
+
+        # Clustered on (champion, category, subcategory, run) so a champion's history is one range scan.
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rating_history (
+                champion_id INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                subcategory TEXT NOT NULL,
+                run_id INTEGER NOT NULL,
+                rating REAL,
+                previous_rating REAL,
+                PRIMARY KEY (champion_id, category, subcategory, run_id),
+                FOREIGN KEY(champion_id) REFERENCES champions(champion_id),
+                FOREIGN KEY(run_id) REFERENCES runs(run_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_rating_history_run ON rating_history(run_id)")
+
+        # Materialized ranks per (category, subcategory) overall ('all') and within each rarity and affinity.
+        # The primary key makes "where does champion X rank" a single lookup; the index serves top-N listings.
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS leaderboard (
+                champion_id INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                subcategory TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                scope_value TEXT NOT NULL,
+                rating REAL,
+                rank INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                percentile REAL NOT NULL,
+                PRIMARY KEY (champion_id, category, subcategory, scope),
+                FOREIGN KEY(champion_id) REFERENCES champions(champion_id)
+            ) WITHOUT ROWID
+        """)
+        # The newest run whose rating_history has been folded into the leaderboard (a single row)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS leaderboard_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                ranked_run_id INTEGER NOT NULL
+            )
+        """)
+        # Which run each generated export (e.g. the xlsx workbook) was built from, and the champion details it holds
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS exports (
+                file_path TEXT PRIMARY KEY,
+                run_id INTEGER NOT NULL,
+                exported_at TEXT NOT NULL,
+                champions_digest TEXT
+            )
+        """)
+        if "champions_digest" not in [row[1] for row in self.cursor.execute("PRAGMA table_info(exports)")]:
+            self.cursor.execute("ALTER TABLE exports ADD COLUMN champions_digest TEXT")
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+            ON leaderboard(category, subcategory, scope, scope_value, rank)
+        """)
+
+        self.conn.commit()
+
+    def begin_run(self):
+        """Starts a scrape run; ratings saved until finish_run() are versioned under its run_id."""
+        self.cursor.execute("INSERT INTO runs (started_at) VALUES (?)", (_now(),))
+        self.conn.commit()
+        self.run_id = self.cursor.lastrowid
+        return self.run_id
+
+    def finish_run(self):
+        """Refreshes the leaderboards for what the run changed, then marks the run as committed."""
+        if self.run_id is None:
+            return
+        finished = self.conn.execute("SELECT finished_at FROM runs WHERE run_id = ?", (self.run_id,)).fetchone()
+        if finished is not None and finished[0] is None:
+            self.refresh_leaderboards(self.run_id, commit=False)
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (_now(), self.run_id))
         self.conn.commit()
+        self.run_id = None
 
-    def save_champion(self, champion_data):
-        """Stores or updates champion core details."""
+    def ranked_run(self):
+        """Newest run folded into the leaderboard, or None if it has never been built."""
+        row = self.conn.execute("SELECT ranked_run_id FROM leaderboard_state WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def _set_ranked_run(self, run_id):
+        self.conn.execute("""
+            INSERT INTO leaderboard_state (id, ranked_run_id) VALUES (1, ?)
+            ON CONFLICT(id) DO UPDATE SET ranked_run_id = MAX(ranked_run_id, excluded.ranked_run_id)
+        """, (run_id,))
+
+    def refresh_leaderboards(self, run_id=None, commit=True):
+        """Rebuilds materialized ranks; with run_id, only the groups moved by changes not yet ranked.
+
+        Those are run_id's changes plus every run's after the last one ranked, finished or not,
+        so a run that aborted before finish_run() is picked up by the next one.
+        """
+        ranked = self.ranked_run()
+        if (run_id is None or ranked is None
+                or self.conn.execute("SELECT 1 FROM leaderboard LIMIT 1").fetchone() is None):
+            self.conn.execute("DELETE FROM leaderboard")
+            for scope, column in LEADERBOARD_SCOPES:
+                self.conn.execute(f"""
+                    INSERT INTO leaderboard (champion_id, category, subcategory, scope, scope_value, rating, rank, total, percentile)
+                    SELECT champion_id, category, subcategory, ?, scope_value, rating,
+                           rank, total, 100.0 * (total - rank + 1) / total
+                    FROM (
+                        SELECT ratings.champion_id, ratings.category, ratings.subcategory, {column} AS scope_value,
+                               ratings.rating,
+                               RANK() OVER w_desc AS rank, COUNT(*) OVER w_all AS total
+                        FROM ratings
+                        JOIN champions ON champions.champion_id = ratings.champion_id
+                        WINDOW w_all AS (PARTITION BY ratings.category, ratings.subcategory, {column}),
+                               w_desc AS (w_all ORDER BY ratings.rating DESC)
+                    )
+                """, (scope,))
+            self.conn.execute("DELETE FROM leaderboard_state")
+            self._set_ranked_run(self.conn.execute("SELECT COALESCE(MAX(run_id), 0) FROM runs").fetchone()[0])
+            if commit:
+                self.conn.commit()
+            return
+
+        changed = set(self.conn.execute(
+            "SELECT champion_id, category, subcategory FROM rating_history WHERE run_id > ? OR run_id = ?",
+            (ranked, run_id)))
+        self._set_ranked_run(run_id)
+        # Champions whose rarity or affinity moved since they were ranked sit in the wrong groups. Every ranked
+        # champion has an Overall Rating row, so checking that one group per champion is enough to find them.
+        drifted = [champion_id for (champion_id,) in self.conn.execute(f"""
+            SELECT leaderboard.champion_id
+            FROM leaderboard
+            JOIN champions ON champions.champion_id = leaderboard.champion_id
+            WHERE leaderboard.category = 'Overall' AND leaderboard.subcategory = 'Overall Rating'
+              AND ({" OR ".join(f"(leaderboard.scope = '{scope}' AND leaderboard.scope_value != {column})"
+                                for scope, column in LEADERBOARD_SCOPES)})
+        """)]
+        for champion_id in drifted:
+            changed.update(self.conn.execute(
+                "SELECT champion_id, category, subcategory FROM ratings WHERE champion_id = ?", (champion_id,)))
+        if not changed:
+            if commit:
+                self.conn.commit()
+            return
+
+        groups = set()
+        for champion_id, category, subcategory in changed:
+            # Both the groups a champion is in now and the ones it was ranked in before
+            current = self.conn.execute(
+                f"SELECT {', '.join(column for _, column in LEADERBOARD_SCOPES)} FROM champions WHERE champion_id = ?",
+                (champion_id,)).fetchone()
+            for (scope, _), value in zip(LEADERBOARD_SCOPES, current):
+                groups.add((category, subcategory, scope, value))
+            groups.update(self.conn.execute("""
+                SELECT category, subcategory, scope, scope_value FROM leaderboard
+                WHERE champion_id = ? AND category = ? AND subcategory = ?
+            """, (champion_id, category, subcategory)))
+
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS affected_groups (
+                category TEXT, subcategory TEXT, scope TEXT, scope_value TEXT,
+                PRIMARY KEY (category, subcategory, scope, scope_value)
+            )
+        """)
+        self.conn.execute("DELETE FROM affected_groups")
+        self.conn.executemany("INSERT OR IGNORE INTO affected_groups VALUES (?, ?, ?, ?)", groups)
+
+        # A champion has one row per scope, so a champion that changed groups is simply re-pointed by the upsert.
+        # Only rows whose group, rating or rank actually moved are written.
+        for scope, column in LEADERBOARD_SCOPES:
+            self.conn.execute(f"""
+                INSERT INTO leaderboard (champion_id, category, subcategory, scope, scope_value, rating, rank, total, percentile)
+                SELECT ranked.champion_id, ranked.category, ranked.subcategory, ?, ranked.scope_value,
+                       ranked.rating, ranked.rank, ranked.total,
+                       100.0 * (ranked.total - ranked.rank + 1) / ranked.total  -- share of the group rated at or below
+                FROM (
+                    SELECT ratings.champion_id, ratings.category, ratings.subcategory, {column} AS scope_value,
+                           ratings.rating,
+                           RANK() OVER w_desc AS rank, COUNT(*) OVER w_all AS total
+                    FROM affected_groups
+                    CROSS JOIN ratings ON ratings.category = affected_groups.category
+                                AND ratings.subcategory = affected_groups.subcategory
+                    JOIN champions ON champions.champion_id = ratings.champion_id
+                    WHERE affected_groups.scope = ? AND affected_groups.scope_value = {column}
+                    WINDOW w_all AS (PARTITION BY ratings.category, ratings.subcategory, {column}),
+                           w_desc AS (w_all ORDER BY ratings.rating DESC)
+                ) AS ranked
+                LEFT JOIN leaderboard AS old
+                       ON old.champion_id = ranked.champion_id AND old.category = ranked.category
+                      AND old.subcategory = ranked.subcategory AND old.scope = ?
+                WHERE old.champion_id IS NULL OR old.scope_value != ranked.scope_value
+                   OR old.rating IS NOT ranked.rating OR old.rank != ranked.rank OR old.total != ranked.total
+                ON CONFLICT(champion_id, category, subcategory, scope) DO UPDATE SET
+                    scope_value = excluded.scope_value, rating = excluded.rating, rank = excluded.rank,
+                    total = excluded.total, percentile = excluded.percentile
+            """, (scope, scope, scope))
+        if commit:
+            self.conn.commit()
+
+    def save_champion(self, champion_data, commit=True):
+        """Stores or updates champion core details; None fields (partial scrapes) keep the stored value."""
         self.cursor.execute("""
             INSERT INTO champions (name, faction, affinity, rarity)
             VALUES (?, ?, ?, ?)
             ON CONFLICT(name) DO UPDATE SET 
-                faction = excluded.faction,
-                affinity = excluded.affinity,
-                rarity = excluded.rarity
+                faction = COALESCE(excluded.faction, champions.faction),
+                affinity = COALESCE(excluded.affinity, champions.affinity),
+                rarity = COALESCE(excluded.rarity, champions.rarity)
+            RETURNING champion_id
         """, (
             champion_data["Name"],
             champion_data["Faction"],
             champion_data["Affinity"],
             champion_data["Rarity"]
         ))
-        self.conn.commit()
+        # lastrowid is stale when the upsert takes the UPDATE branch, so read the id back explicitly.
+        champion_id = self.cursor.fetchone()[0]
+        if commit:
+            self.conn.commit()
 
-        return self.cursor.lastrowid  # Fetch assigned champion_id
+        return champion_id
 
     def save_ratings(self, champion_id, ratings_data):
         """Stores or updates champion ratings dynamically."""
-        for category, subcategories in ratings_data.items():
-            if isinstance(subcategories, dict):  # Nested categories
-                for subcategory, rating in subcategories.items():
-                    self.cursor.execute("""
-                        INSERT INTO ratings (champion_id, category, subcategory, rating)
-                        VALUES (?, ?, ?, ?)
-                        ON CONFLICT(champion_id, category, subcategory) DO UPDATE SET 
-                            rating = excluded.rating
-                    """, (champion_id, category, subcategory, rating))
-            else:  # Direct category ratings (Overall Rating, Book Value)
-                self.cursor.execute("""
-                    INSERT INTO ratings (champion_id, category, subcategory, rating)
-                    VALUES (?, ?, ?, ?)
-                    ON CONFLICT(champion_id, category, subcategory) DO UPDATE SET 
-                        rating = excluded.rating
-                """, (champion_id, "Overall", category, subcategories))
+        self.save_rows(champion_id, champion.flatten_ratings(ratings_data))
 
-        self.conn.commit()
+    def save_rows(self, champion_id, rows, commit=True, source=None):
+        """Stores or updates flat (category, subcategory, rating) rows for a champion, as scraped from source.
+
+        Merge rule: the primary source (HellHades, also assumed when source is None) overwrites
+        any value. Any other source only writes ratings that are empty or already its own, so a
+        second site fills gaps without flipping HellHades' values back and forth in rating_history.
+        """
+        # Only values that actually changed are written, and during a run each change is also versioned.
+        source = source or PRIMARY_SOURCE
+        current = {
+            (category, subcategory): (rating, stored_source or PRIMARY_SOURCE)
+            for category, subcategory, rating, stored_source in self.conn.execute(
+                "SELECT category, subcategory, rating, source FROM ratings WHERE champion_id = ?", (champion_id,))
+        }
+        missing = object()
+        changes = []
+        for category, subcategory, rating in rows:
+            previous, owner = current.get((category, subcategory), (missing, source))
+            if owner != source and source != PRIMARY_SOURCE and previous is not None:
+                continue  # Another source's value
+            if previous != rating or owner != source:
+                changes.append((category, subcategory, rating, None if previous is missing else previous))
+        if not changes:
+            if commit:
+                self.conn.commit()
+            return
+
+        if self.run_id is not None:
+            # A change of owner alone (the same value, now from the primary source) isn't a rating change.
+            history = [(champion_id, category, subcategory, self.run_id, rating, previous)
+                       for category, subcategory, rating, previous in changes
+                       if (category, subcategory) not in current or previous != rating]
+            # Saved twice in one run (a retried job, or another source before HellHades): keep the value from
+            # before the run as previous_rating, and drop the row if the run ends up back at it.
+            self.cursor.executemany("""
+                INSERT INTO rating_history (champion_id, category, subcategory, run_id, rating, previous_rating)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(champion_id, category, subcategory, run_id) DO UPDATE SET rating = excluded.rating
+            """, history)
+            self.cursor.executemany("""
+                DELETE FROM rating_history
+                WHERE champion_id = ? AND category = ? AND subcategory = ? AND run_id = ?
+                  AND rating IS previous_rating
+            """, [row[:4] for row in history])
+
+        self.cursor.executemany("""
+            INSERT INTO ratings (champion_id, category, subcategory, rating, source)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(champion_id, category, subcategory) DO UPDATE SET 
+                rating = excluded.rating, source = excluded.source
+        """, [(champion_id, category, subcategory, rating, source) for category, subcategory, rating, _ in changes])
+        if commit:
+            self.conn.commit()
+
+    def save_record(self, record, commit=True):
+        """Stores a Champion.toRecord() payload in a single transaction; an optional "Source" key names its site."""
+        champion_id = self.save_champion(record, commit=False)
+        self.save_rows(champion_id, record["Rows"], commit=False, source=record.get("Source"))
+        if commit:
+            self.conn.commit()
+        return champion_id
+
+    def iter_records(self):
+        """Yields every stored champion in Champion.toRecord() shape, one at a time."""
+        cursor = self.conn.execute("""
+            SELECT champions.champion_id, champions.name, champions.faction, champions.affinity, champions.rarity,
+                   ratings.category, ratings.subcategory, ratings.rating
+            FROM champions
+            LEFT JOIN ratings ON champions.champion_id = ratings.champion_id
+            ORDER BY champions.champion_id
+        """)
+        for _, group in itertools.groupby(cursor, key=lambda row: row[0]):
+            first = next(group)
+            rows = [] if first[5] is None else [first[5:]]
+            rows.extend(row[5:] for row in group)
+            yield {
+                "Name": first[1],
+                "Faction": first[2],
+                "Affinity": first[3],
+                "Rarity": first[4],
+                "Rows": rows
+            }
 
     def pull_data(self, category, subcategory, limit = 10):
-        self.cursor.execute("""
-            SELECT champions.name, ratings.subcategory, ratings.rating 
-            FROM champions 
+        for name, _, _, _, rating in self.leaderboard(category, subcategory, limit):
+            print((name, subcategory, rating))  # Displays top Demon Lord champions
+
+    def leaderboard(self, category, subcategory, limit=10, faction=None, affinity=None, rarity=None, ranked=False):
+        """Returns (name, faction, affinity, rarity, rating) ordered best first.
+
+        With ranked, each row also carries (rank, total, percentile) within the filtered champions,
+        the same columns ranked_leaderboard() reads from the materialized ranks.
+        """
+        window = ", RANK() OVER (ORDER BY ratings.rating DESC) AS rank, COUNT(*) OVER () AS total" if ranked else ""
+        query = f"""
+            SELECT champions.name, champions.faction, champions.affinity, champions.rarity, ratings.rating{window}
+            FROM champions
             JOIN ratings ON champions.champion_id = ratings.champion_id
             WHERE ratings.category = ? AND ratings.subcategory = ?
-            ORDER BY ratings.rating DESC
-            LIMIT ?;
-        """, (category, subcategory, limit))
+        """
+        params = [category, subcategory]
+        query, params = _filter_champions(query, params, faction, affinity, rarity)
+        if ranked:
+            query = f"SELECT *, 100.0 * (total - rank + 1) / total FROM ({query}) ORDER BY rank, name LIMIT ?"
+        else:
+            query += " ORDER BY ratings.rating DESC, champions.name LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(query, params).fetchall()
+
+    def ranked_leaderboard(self, category, subcategory, scope="all", scope_value="", limit=10):
+        """Top of a materialized leaderboard, best first:
+        (name, faction, affinity, rarity, rating, rank, total, percentile)."""
+        return self.conn.execute("""
+            SELECT champions.name, champions.faction, champions.affinity, champions.rarity,
+                   leaderboard.rating, leaderboard.rank, leaderboard.total, leaderboard.percentile
+            FROM leaderboard
+            JOIN champions ON champions.champion_id = leaderboard.champion_id
+            WHERE leaderboard.category = ? AND leaderboard.subcategory = ?
+              AND leaderboard.scope = ? AND leaderboard.scope_value = ?
+            ORDER BY leaderboard.rank, champions.name
+            LIMIT ?
+        """, (category, subcategory, scope, scope_value, limit)).fetchall()
+
+    def ranks(self, name, category=None, subcategory=None):
+        """(category, subcategory, scope, scope_value, rating, rank, total, percentile) rows for one champion."""
+        query = """
+            SELECT leaderboard.category, leaderboard.subcategory, leaderboard.scope, leaderboard.scope_value,
+                   leaderboard.rating, leaderboard.rank, leaderboard.total, leaderboard.percentile
+            FROM champions
+            JOIN leaderboard ON leaderboard.champion_id = champions.champion_id
+            WHERE champions.name = ?
+        """
+        params = [name]
+        if category is not None:
+            query += " AND leaderboard.category = ?"
+            params.append(category)
+        if subcategory is not None:
+            query += " AND leaderboard.subcategory = ?"
+            params.append(subcategory)
+        query += " ORDER BY leaderboard.category, leaderboard.subcategory, leaderboard.scope"
+        return self.conn.execute(query, params).fetchall()
+
+    def get_record(self, name):
+        """Returns one champion in Champion.toRecord() shape, or None."""
+        row = self.conn.execute(
+            "SELECT champion_id, name, faction, affinity, rarity FROM champions WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT category, subcategory, rating FROM ratings WHERE champion_id = ? ORDER BY category, subcategory",
+            (row[0],)).fetchall()
+        return {"Name": row[1], "Faction": row[2], "Affinity": row[3], "Rarity": row[4], "Rows": rows}
+
+    def search(self, name_contains=None, faction=None, affinity=None, rarity=None, limit=100):
+        """Returns (name, faction, affinity, rarity) for champions matching every given filter."""
+        query = "SELECT champions.name, champions.faction, champions.affinity, champions.rarity FROM champions WHERE 1 = 1"
+        params = []
+        if name_contains:
+            query += " AND champions.name LIKE ?"
+            params.append(f"%{name_contains}%")
+        query, params = _filter_champions(query, params, faction, affinity, rarity)
+        query += " ORDER BY champions.name LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(query, params).fetchall()
+
+    def champion_names(self):
+        return [name for (name,) in self.conn.execute("SELECT name FROM champions ORDER BY name")]
+
+    def export_revision(self, file_path):
+        """(run_id, champions_digest) the export at file_path was last generated from, or None."""
+        return self.conn.execute("SELECT run_id, champions_digest FROM exports WHERE file_path = ?",
+                                 (os.path.abspath(file_path),)).fetchone()
+
+    def set_export_revision(self, file_path, run_id, digest=None):
+        self.conn.execute("""
+            INSERT INTO exports (file_path, run_id, exported_at, champions_digest) VALUES (?, ?, ?, ?)
+            ON CONFLICT(file_path) DO UPDATE SET
+                run_id = excluded.run_id, exported_at = excluded.exported_at, champions_digest = excluded.champions_digest
+        """, (os.path.abspath(file_path), run_id, _now(), digest))
+        self.conn.commit()
+
+    def last_run(self):
+        """Id of the most recent run, finished or not (0 if none)."""
+        return self.conn.execute("SELECT COALESCE(MAX(run_id), 0) FROM runs").fetchone()[0]
+
+    def ratings_changed_since(self, run_id):
+        """True if any run after run_id (finished or not) changed a rating."""
+        return self.conn.execute("SELECT 1 FROM rating_history WHERE run_id > ? LIMIT 1", (run_id,)).fetchone() is not None
+
+    def champions_digest(self):
+        """Hash of every champion's id, name, faction, affinity and rarity; moves when any of them changes."""
+        digest = hashlib.sha1()
+        for row in self.conn.execute("SELECT champion_id, name, faction, affinity, rarity FROM champions ORDER BY champion_id"):
+            digest.update(repr(row).encode("utf-8"))
+        return digest.hexdigest()
+
+    def name_index(self):
+        """NameIndex over every stored champion name: exact lookups across spelling variants, suggestions for typos."""
+        return champion_names.NameIndex(name for (name,) in self.conn.execute("SELECT name FROM champions"))
+
+    def latest_run(self):
+        """Returns the id of the most recent finished run (0 if none); changes whenever a run commits."""
+        return self.conn.execute("SELECT COALESCE(MAX(run_id), 0) FROM runs WHERE finished_at IS NOT NULL").fetchone()[0]
+
+    def changes_since(self, run_id):
+        """Returns (run_id, name, category, subcategory, previous_rating, rating) for every change after run_id."""
+        return self.conn.execute("""
+            SELECT rating_history.run_id, champions.name, rating_history.category, rating_history.subcategory,
+                   rating_history.previous_rating, rating_history.rating
+            FROM rating_history
+            JOIN champions ON champions.champion_id = rating_history.champion_id
+            WHERE rating_history.run_id > ?
+            ORDER BY rating_history.run_id, champions.name, rating_history.category, rating_history.subcategory
+        """, (run_id,)).fetchall()
+
+    def rating_history(self, name, category=None, subcategory=None):
+        """Returns (run_id, started_at, category, subcategory, rating) for each recorded change of a champion."""
+        query = """
+            SELECT rating_history.run_id, runs.started_at, rating_history.category, rating_history.subcategory,
+                   rating_history.rating
+            FROM champions
+            JOIN rating_history ON rating_history.champion_id = champions.champion_id
+            JOIN runs ON runs.run_id = rating_history.run_id
+            WHERE champions.name = ?
+        """
+        params = [name]
+        if category is not None:
+            query += " AND rating_history.category = ?"
+            params.append(category)
+        if subcategory is not None:
+            query += " AND rating_history.subcategory = ?"
+            params.append(subcategory)
+        query += " ORDER BY rating_history.category, rating_history.subcategory, rating_history.run_id"
+        return self.conn.execute(query, params).fetchall()
 
-        for row in self.cursor.fetchall():
-            print(row)  # Displays top Demon Lord champions
+    def list_runs(self):
+        """Returns (run_id, started_at, finished_at, changed_values) for every run."""
+        return self.conn.execute("""
+            SELECT runs.run_id, runs.started_at, runs.finished_at,
+                   (SELECT COUNT(*) FROM rating_history WHERE rating_history.run_id = runs.run_id)
+            FROM runs
+            ORDER BY runs.run_id
+        """).fetchall()
 
     def close(self):
         """Closes the database connection."""
@@ -2,61 +2,50 @@ import pandas as pd
 import os
 
 class ChampionExcel:
-    """Class to handle champion data storage in Excel format."""
+    """Reads the champion roster from a workbook; export_database() writes the generated one."""
     
     def __init__(self, file_path):
         self.file_path = file_path
             # Load existing data if file exists
         if os.path.exists(file_path):
-            with pd.ExcelFile(file_path) as existing:
-                self.df_champions = pd.read_excel(existing, sheet_name="Champions")
-                self.df_ratings = pd.read_excel(existing, sheet_name="Ratings")
+            self.df_champions = pd.read_excel(file_path, sheet_name="Champions")
         else:
             self.df_champions = pd.DataFrame(columns=["Champion_ID", "Name", "Faction", "Affinity", "Rarity"])
-            self.df_ratings = pd.DataFrame(columns=["Champion_ID", "Category", "Battle", "Rating"])
-
-    def writeChampion(self, champion_data):
-        """Updates or appends a champion's ratings to an Excel file."""
-        
-        # **Check if the champion already exists**
-        existing_entry = self.df_champions[self.df_champions["Name"].str.lower() == champion_data["Name"].lower()]
-
-        if not existing_entry.empty:
-            champion_id = existing_entry.iloc[0]["Champion_ID"]  # Use existing ID
-        else:
-            champion_id = self.df_champions["Champion_ID"].max() + 1 if not self.df_champions.empty else 1
-
-        # Append new champion data
-        new_champion = pd.DataFrame([{
-            "Champion_ID": champion_id,
-            "Name": champion_data["Name"],
-            "Faction": champion_data["Faction"],
-            "Affinity": champion_data["Affinity"],
-            "Rarity": champion_data["Rarity"]
-        }])
-        self.df_champions = self.df_champions[self.df_champions["Champion_ID"] != champion_id]  # Remove old entry if exists
-        self.df_champions = pd.concat([self.df_champions, new_champion], ignore_index=True)
-
-        # **Process Ratings**
-        ratings_list = []
-        for category, battles in champion_data["Ratings"].items():
-            if isinstance(battles, dict):
-                for battle, rating in battles.items():
-                    ratings_list.append({"Champion_ID": champion_id, "Category": category, "Battle": battle, "Rating": rating})
-            else:
-                ratings_list.append({"Champion_ID": champion_id, "Category": "Overall", "Battle": category, "Rating": battles})
-
-        new_ratings = pd.DataFrame(ratings_list)
-
-        # **Remove old ratings for this champion before appending fresh**
-        self.df_ratings = self.df_ratings[self.df_ratings["Champion_ID"] != champion_id]
-        self.df_ratings = pd.concat([self.df_ratings, new_ratings], ignore_index=True)
-
-        # **Save back to Excel**
-        with pd.ExcelWriter(self.file_path, engine="xlsxwriter") as writer:
-            self.df_champions.to_excel(writer, sheet_name="Champions", index=False)
-            self.df_ratings.to_excel(writer, sheet_name="Ratings", index=False)
 
     def getChampionNames(self):
         champion_names = self.df_champions.set_index("Champion_ID")["Name"].to_dict()
         return list(champion_names.values())
+
+def export_database(db, file_path, force=False):
+    """Regenerates the workbook from SQLite in one pass; returns False when it is already current.
+
+    Champion_IDs are the database's own ids. The workbook is skipped unless a run since the
+    last export to this path changed a rating, or a champion was added or changed (or force
+    is set). A run that saved nothing new leaves the file alone.
+    """
+    revision, digest = db.last_run(), db.champions_digest()
+    stamp = db.export_revision(file_path)
+    if (not force and stamp is not None and os.path.exists(file_path)
+            and stamp[1] == digest and not db.ratings_changed_since(stamp[0])):
+        return False
+
+    df_champions = pd.read_sql_query("""
+        SELECT champion_id AS Champion_ID, name AS Name, faction AS Faction, affinity AS Affinity, rarity AS Rarity
+        FROM champions
+        ORDER BY champion_id
+    """, db.conn)
+    df_ratings = pd.read_sql_query("""
+        SELECT champion_id AS Champion_ID, category AS Category, subcategory AS Battle, rating AS Rating
+        FROM ratings
+        ORDER BY champion_id, category, subcategory
+    """, db.conn)
+
+    # Write beside the target and swap it in, so a reader never sees a half-written workbook
+    temp_path = f"{file_path}.tmp.xlsx"
+    with pd.ExcelWriter(temp_path, engine="xlsxwriter") as writer:
+        df_champions.to_excel(writer, sheet_name="Champions", index=False)
+        df_ratings.to_excel(writer, sheet_name="Ratings", index=False)
+    os.replace(temp_path, file_path)
+
+    db.set_export_revision(file_path, revision, digest)
+    return True
@@ -0,0 +1,50 @@
+import json
+
+try:
+    import orjson  # Optional fast backend
+except ImportError:
+    orjson = None
+
+def dumps_record(record, fast=True):
+    """Serializes one Champion.toRecord() payload to a single JSON line (bytes, no trailing newline)."""
+    if fast and orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+class JsonLinesWriter:
+    """Streams champion records to a JSON Lines file, one compact object per line."""
+
+    def __init__(self, file_path, append=False, fast=True):
+        self.file_path = file_path
+        self.fast = fast
+        self.count = 0
+        self.file = open(file_path, "ab" if append else "wb")
+
+    def write(self, record):
+        self.file.write(dumps_record(record, fast=self.fast))
+        self.file.write(b"\n")
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def export_jsonl(records, file_path, fast=True):
+    """Writes an iterable of records (e.g. ChampionDatabase.iter_records()) and returns how many were written."""
+    with JsonLinesWriter(file_path, fast=fast) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+def read_jsonl(file_path):
+    """Yields records back out of a JSON Lines file."""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(file_path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
@@ -0,0 +1,191 @@
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import getPage
+import loadChampion
+from champion_database import ChampionDatabase
+
+class JobQueue:
+    """Champion scrape jobs in a shared table, handed out under time-limited leases.
+
+    A worker owns a job only while its lease is live; it extends the lease with
+    heartbeat() and a job whose lease has expired is handed to the next claim().
+    Every transition is a single UPDATE ... WHERE, so several processes (or hosts
+    sharing the database) never hand the same live job to two workers.
+    """
+
+    def __init__(self, db_path="jobs.db", lease_seconds=120, max_attempts=3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)  # Autocommit: one statement, one transaction
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                name TEXT PRIMARY KEY,
+                run_id INTEGER,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, lease_expires)")
+
+    def enqueue(self, names, run_id=None):
+        """Adds (or re-opens) a job per champion; returns how many were queued."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany("""
+            INSERT INTO jobs (name, run_id) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                run_id = excluded.run_id, status = 'pending', worker = NULL, lease_expires = NULL,
+                attempts = 0, last_error = NULL
+        """, [(name, run_id) for name in names])
+        self.conn.execute("COMMIT")
+        return len(names)
+
+    def claim(self, worker):
+        """Leases the next pending (or abandoned) job to worker; returns (name, run_id) or None."""
+        now = time.time()
+        # A job whose worker keeps dying never reaches fail(), so its expired lease is where attempts run out.
+        self.conn.execute("""
+            UPDATE jobs SET status = 'failed', lease_expires = NULL,
+                            last_error = COALESCE(last_error, 'lease expired ' || attempts || ' times')
+            WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+        """, (now, self.max_attempts))
+        return self.conn.execute("""
+            UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1
+            WHERE name = (
+                SELECT name FROM jobs
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ? AND attempts < ?)
+                ORDER BY attempts, name
+                LIMIT 1
+            )
+            RETURNING name, run_id
+        """, (worker, now + self.lease_seconds, now, self.max_attempts)).fetchone()
+
+    def heartbeat(self, name, worker):
+        """Extends worker's lease; False means the lease expired and the job now belongs to someone else."""
+        cursor = self.conn.execute("""
+            UPDATE jobs SET lease_expires = ?
+            WHERE name = ? AND worker = ? AND status = 'leased'
+        """, (time.time() + self.lease_seconds, name, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, name, worker):
+        cursor = self.conn.execute("""
+            UPDATE jobs SET status = 'done', lease_expires = NULL
+            WHERE name = ? AND worker = ? AND status = 'leased'
+        """, (name, worker))
+        return cursor.rowcount == 1
+
+    def fail(self, name, worker, error):
+        """Releases the job for a retry, or marks it failed after max_attempts."""
+        self.conn.execute("""
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                            lease_expires = NULL, last_error = ?
+            WHERE name = ? AND worker = ? AND status = 'leased'
+        """, (self.max_attempts, error, name, worker))
+
+    def remaining(self, run_id=None):
+        """Jobs not yet done or failed (optionally for one run)."""
+        query = "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+        params = ()
+        if run_id is not None:
+            query += " AND run_id = ?"
+            params = (run_id,)
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def runs(self):
+        """Run ids that still have jobs in the table."""
+        return [run_id for (run_id,) in self.conn.execute(
+            "SELECT DISTINCT run_id FROM jobs WHERE run_id IS NOT NULL ORDER BY run_id")]
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
+
+def _heartbeat(job_db, name, worker, lease_seconds, stop, lost):
+    # sqlite3 connections can't cross threads, so the heartbeat keeps its own (with the worker's lease length).
+    jobs = JobQueue(job_db, lease_seconds=lease_seconds)
+    interval = lease_seconds / 3
+    try:
+        while not stop.wait(interval):
+            if not jobs.heartbeat(name, worker):
+                lost.set()
+                return
+    finally:
+        jobs.close()
+
+def run_worker(job_db, champions_db, worker=None, lease_seconds=120, poll_interval=5.0,
+               fetch=getPage.get_hellhades_page, parse=loadChampion.load_hell_Hades):
+    """Claims and scrapes jobs until none are pending or leased; returns how many this worker saved."""
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    jobs = JobQueue(job_db, lease_seconds=lease_seconds)
+    db = ChampionDatabase(db_name=champions_db)
+    saved = 0
+    try:
+        while True:
+            job = jobs.claim(worker)
+            if job is None:
+                if jobs.remaining() == 0:
+                    # The last job may have been failed inside claim() (its worker died), so no one closed its run.
+                    for run_id in jobs.runs():
+                        db.run_id = run_id
+                        db.finish_run()
+                    break
+                time.sleep(poll_interval)  # Other workers hold leases; wait in case one of them expires
+                continue
+
+            name, run_id = job
+            stop, lost = threading.Event(), threading.Event()
+            beat = threading.Thread(target=_heartbeat, args=(job_db, name, worker, lease_seconds, stop, lost),
+                                    daemon=True)
+            beat.start()
+            try:
+                print(f"[{worker}] Loading champion: {name}")
+                page = fetch(name)
+                champion = parse(page) if page else None
+                if champion is None:
+                    jobs.fail(name, worker, "fetch failed" if not page else "parse failed")
+                elif lost.is_set():
+                    print(f"[{worker}] Lease on {name} expired, leaving it to its new owner.")
+                else:
+                    db.run_id = run_id
+                    db.save_record(champion.toRecord())
+                    if jobs.complete(name, worker):
+                        saved += 1
+                        print(f"[{worker}] Champion {champion.name} saved!")
+            except Exception as e:
+                jobs.fail(name, worker, str(e))
+                print(f"[{worker}] Failed on {name}: {e}")
+            finally:
+                stop.set()
+                beat.join()
+
+            if run_id is not None and jobs.remaining(run_id) == 0:
+                db.run_id = run_id
+                db.finish_run()
+    finally:
+        db.run_id = None
+        jobs.close()
+        db.close()
+    return saved
+
+def spawn_workers(count, job_db, champions_db, **options):
+    """Starts count local worker processes against one job database and waits for them."""
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(job_db, champions_db), kwargs=options)
+        for _ in range(count)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return [process.exitcode for process in processes]
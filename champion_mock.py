@@ -0,0 +1,173 @@
+import argparse
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import loadChampion
+from champion_export import dumps_record
+
+NOT_FOUND_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Page not found - HellHades</title></head>
+<body><h1>Page not found</h1></body></html>"""
+
+ERROR_PAGE = b"""<!DOCTYPE html>
+<html><head><title>503 Service Unavailable</title></head>
+<body><h1>Service Unavailable</h1></body></html>"""
+
+# Stand-in for a champion page that loads its ratings as JSON, the response getPage.fetch_champion captures.
+# There is no ratings list in the DOM, so the capture path is the only way to a Champion.
+CAPTURE_PAGE = """<!DOCTYPE html>
+<html><head><title>{slug} - HellHades</title></head>
+<body><div id="champion"></div>
+<script>
+fetch("ratings.json").then(response => response.json()).then(data => {{
+    document.getElementById("champion").textContent = JSON.stringify(data);
+}});
+</script>
+</body></html>"""
+
+class MockSite:
+    """Recorded champion pages (getPage record_dir) plus the faults to inject when serving them.
+
+    Pages are indexed by slug and read from disk per request, so a large recording
+    costs no memory. Every request sleeps latency +/- jitter seconds, then fails with
+    a 503 at error_rate or answers with HellHades' "Page not found" at not_found_rate.
+    seed makes the injected faults reproducible between benchmark runs.
+
+    With capture, each champion page is CAPTURE_PAGE instead, which fetches
+    /raid/champions/<slug>/ratings.json: <slug>.json from record_dir if there is one,
+    otherwise the recorded page's ratings as Champion.toJson() would write them.
+    """
+
+    def __init__(self, record_dir, latency=0.0, jitter=0.0, error_rate=0.0, not_found_rate=0.0, seed=None,
+                 capture=False):
+        self.pages = {
+            entry.name[:-len(".html")]: entry.path
+            for entry in os.scandir(record_dir) if entry.is_file() and entry.name.endswith(".html")
+        }
+        self.feeds = {
+            entry.name[:-len(".json")]: entry.path
+            for entry in os.scandir(record_dir) if entry.is_file() and entry.name.endswith(".json")
+        }
+        self.capture = capture
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        self.random = random.Random(seed)
+        self.counts = {"requests": 0, "ok": 0, "errors": 0, "not_found": 0}
+        self._lock = threading.Lock()
+
+    def delay(self):
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def feed(self, slug):
+        # JSON body for a champion's ratings.json, or None when neither a fixture nor a parseable page exists.
+        if slug in self.feeds:
+            with open(self.feeds[slug], "rb") as f:
+                return f.read()
+        if slug in self.pages:
+            with open(self.pages[slug], encoding="utf-8") as f:
+                this_champion = loadChampion.load_hell_Hades(f.read())
+            if this_champion is not None:
+                return dumps_record(this_champion.toJson(as_dict=True))
+        return None
+
+    def page(self, slug):
+        if self.capture:
+            return CAPTURE_PAGE.format(slug=slug).encode() if slug in self.pages or slug in self.feeds else None
+        if slug not in self.pages:
+            return None
+        with open(self.pages[slug], "rb") as f:
+            return f.read()
+
+    def respond(self, path):
+        """Returns (status, body, content type) for a request path, after the simulated latency.
+
+        Anything but a champion page (or its ratings.json) gets a plain 404 at once, without
+        latency, faults or a count, so a page's asset requests don't skew the benchmark.
+        """
+        parts = [part for part in urlsplit(path).path.split("/") if part]
+        content_type = "text/html; charset=utf-8"
+        if len(parts) == 3 and parts[:2] == ["raid", "champions"]:
+            load = self.page
+        elif self.capture and len(parts) == 4 and parts[:2] == ["raid", "champions"] and parts[3] == "ratings.json":
+            load, content_type = self.feed, "application/json"
+        else:
+            return 404, b"Not found", "text/plain; charset=utf-8"
+        time.sleep(self.delay())
+        body = load(parts[2])
+        roll = self.random.random()
+        if roll < self.error_rate:
+            outcome, status, body, content_type = "errors", 503, ERROR_PAGE, "text/html; charset=utf-8"
+        elif body is None or roll < self.error_rate + self.not_found_rate:
+            outcome, status, body, content_type = "not_found", 404, NOT_FOUND_PAGE, "text/html; charset=utf-8"
+        else:
+            outcome, status = "ok", 200
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts[outcome] += 1
+        return status, body, content_type
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, pages=len(self.pages.keys() | self.feeds.keys()))
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /raid/champions/<slug>/ (and ratings.json with capture); GET /__stats reports what was served."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    site = None
+
+    def do_GET(self):
+        if self.path == "/__stats":
+            return self._send(200, dumps_record(self.site.stats()), "application/json")
+        self._send(*self.site.respond(self.path))
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(site, host="127.0.0.1", port=8081):
+    handler = type("BoundMockRequestHandler", (MockRequestHandler,), {"site": site})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def serve(site, host="127.0.0.1", port=8081):
+    server = make_server(site, host, port)
+    print(f"Replaying {site.stats()['pages']} pages on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {site.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded champion pages as a local mock of HellHades")
+    parser.add_argument("record_dir", help="Directory of pages saved with main.py --record")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds around --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 503")
+    parser.add_argument("--not-found-rate", type=float, default=0.0,
+                        help='Fraction of requests answered with the "Page not found" page')
+    parser.add_argument("--seed", type=int, help="Seed for reproducible fault injection")
+    parser.add_argument("--capture", action="store_true",
+                        help="Serve stand-in pages that load ratings.json, for main.py --capture against the mock")
+    args = parser.parse_args()
+    serve(MockSite(args.record_dir, args.latency, args.jitter, args.error_rate, args.not_found_rate, args.seed,
+                   args.capture),
+          args.host, args.port)
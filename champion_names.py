@@ -0,0 +1,73 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+def _fold(text):
+    # Strip accents and case: "Ýmir" and "ymir" fold to the same letters.
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+def normalize_name(name):
+    """Lookup key for a champion name: accent-free, lowercase, letters and digits only."""
+    return re.sub(r"[^a-z0-9]", "", _fold(name))
+
+def slugify(name):
+    """URL slug the way HellHades (WordPress) builds it: "Ma'Shalled" -> "mashalled", "Fu Shan" -> "fu-shan"."""
+    slug = re.sub(r"[^a-z0-9\s-]", "", _fold(name).strip())
+    return re.sub(r"[\s-]+", "-", slug).strip("-")
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex:
+    """Matches user and spreadsheet spellings to canonical champion names.
+
+    resolve() only accepts an exact match on the normalized key (accents, case and
+    punctuation ignored), so a different champion is never substituted: "Dark Elhain"
+    and "Elhain" are both real. suggest() offers fuzzy candidates from a trigram index
+    for error messages; it only scores names sharing a trigram with the input, so it
+    stays near-constant as the roster grows.
+    """
+
+    def __init__(self, names=()):
+        self.canonical = {}
+        self.grams = {}
+        self.postings = defaultdict(set)
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.canonical)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self.canonical
+
+    def add(self, name):
+        key = normalize_name(name)
+        if not key or key in self.canonical:
+            return
+        self.canonical[key] = name
+        self.grams[key] = _trigrams(key)
+        for gram in self.grams[key]:
+            self.postings[gram].add(key)
+
+    def resolve(self, text):
+        """Returns the canonical name for text, or None unless it is the same name spelled differently."""
+        return self.canonical.get(normalize_name(text))
+
+    def suggest(self, text, limit=3, cutoff=0.5):
+        """Canonical names similar to text, best first, for "did you mean" messages."""
+        key = normalize_name(text)
+        if not key:
+            return []
+        grams = _trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self.postings.get(gram, ()):
+                shared[candidate] += 1
+        # Dice coefficient over trigram sets
+        scored = [(2 * count / (len(grams) + len(self.grams[candidate])), candidate)
+                  for candidate, count in shared.items()]
+        scored = sorted((item for item in scored if item[0] >= cutoff), key=lambda item: (-item[0], item[1]))
+        return [self.canonical[candidate] for _, candidate in scored[:limit]]
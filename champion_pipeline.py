@@ -0,0 +1,142 @@
+import os
+import queue
+import threading
+import getPage
+import loadChampion
+
+_DONE = object()  # End-of-stream marker passed between stages
+
+def read_saved_page(path):
+    """Fetch function for reparse runs: the 'name' is the path of a saved HTML page."""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def saved_pages(directory):
+    """Lazily lists saved HTML pages in a directory, for use as the pipeline's name source."""
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.is_file() and entry.name.endswith(".html"):
+            yield entry.path
+
+class StreamingPipeline:
+    """Fetch -> parse -> persist connected by bounded queues.
+
+    Every queue holds at most queue_size items, so a slow stage blocks the stages
+    feeding it instead of letting pages pile up. At any moment the process holds
+    at most a few HTML strings, one soup tree and a few records, no matter how
+    many champions the run covers. Sinks must write incrementally (write(record)).
+    """
+
+    def __init__(self, sinks, fetch=getPage.get_hellhades_page, parse=loadChampion.load_hell_Hades,
+                 fetch_workers=1, queue_size=4):
+        self.sinks = sinks
+        self.fetch = fetch
+        self.parse = parse
+        self.fetch_workers = max(1, fetch_workers)
+        self.queue_size = max(1, queue_size)
+        self.stats = {"fetched": 0, "fetch_failed": 0, "parsed": 0, "parse_failed": 0, "saved": 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _put(self, q, item):
+        # Blocks while the queue is full (backpressure), but gives up once the run is being torn down.
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _feed(self, names, name_q):
+        try:
+            for name in names:
+                if not self._put(name_q, name):
+                    return
+        finally:
+            for _ in range(self.fetch_workers):
+                self._put(name_q, _DONE)
+
+    def _fetch_worker(self, name_q, page_q):
+        while True:
+            name = self._get(name_q)
+            if name is _DONE:
+                break
+            try:
+                html = self.fetch(name)
+            except Exception as e:
+                print(f"Failed to retrieve page for {name}: {e}")
+                html = None
+            if html:
+                self._count("fetched")
+                if not self._put(page_q, (name, html)):
+                    break
+            else:
+                self._count("fetch_failed")
+            del html
+        self._put(page_q, _DONE)
+
+    def _parse_worker(self, page_q, record_q):
+        remaining = self.fetch_workers
+        while remaining:
+            item = self._get(page_q)
+            if item is _DONE:
+                remaining -= 1
+                continue
+            name, html = item
+            del item
+            try:
+                champion = self.parse(html)
+            except Exception as e:
+                print(f"Failed to parse page for {name}: {e}")
+                champion = None
+            del html  # Drop the page before the record goes downstream
+            if champion is None:
+                self._count("parse_failed")
+                continue
+            self._count("parsed")
+            if not self._put(record_q, champion.toRecord()):
+                return
+        self._put(record_q, _DONE)
+
+    def run(self, names):
+        """Processes every name and returns the stats dict. Persisting happens on the calling thread."""
+        self._stop.clear()
+        name_q = queue.Queue(self.queue_size)
+        page_q = queue.Queue(self.queue_size)
+        record_q = queue.Queue(self.queue_size)
+
+        threads = [threading.Thread(target=self._feed, args=(names, name_q), daemon=True)]
+        threads += [threading.Thread(target=self._fetch_worker, args=(name_q, page_q), daemon=True)
+                    for _ in range(self.fetch_workers)]
+        threads.append(threading.Thread(target=self._parse_worker, args=(page_q, record_q), daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                record = self._get(record_q)
+                if record is _DONE:
+                    break
+                for sink in self.sinks:
+                    sink.write(record)
+                self._count("saved")
+                print(f"Champion {record['Name']} saved!")
+        finally:
+            # Either the stream finished or a sink failed; in both cases release any blocked stage.
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        return self.stats
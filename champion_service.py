@@ -0,0 +1,295 @@
+import argparse
+import http.client
+import statistics
+import threading
+from collections import OrderedDict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+from champion_database import ChampionDatabase
+from champion_export import dumps_record
+from champion_similarity import SimilarityIndex
+
+class QueryCache:
+    """Encoded JSON responses keyed by request path, dropped whenever a scrape run commits.
+
+    At most max_entries responses are kept (least recently used go first), since keys
+    include free-form query parameters such as search text.
+    """
+
+    def __init__(self, db_path, poll_interval=0.5, max_entries=1024):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.names = None  # NameIndex for the current version, built on first lookup by spelling variant
+        self.similarity = None  # SimilarityIndex, built on the first /similar request and refreshed per run
+        self._similarity_lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+
+    def db(self):
+        # sqlite3 connections are bound to the thread that opened them, so each handler thread gets its own.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = ChampionDatabase(db_name=self.db_path, read_only=True)
+        return db
+
+    def start(self):
+        self.version = self.db().latest_run()
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        # Polling one indexed MAX() keeps the request path free of any database work on a cache hit.
+        while not self._stop.wait(self.poll_interval):
+            try:
+                version = self.db().latest_run()
+            except Exception as e:
+                print(f"Warning: Could not check for new runs: {e}")
+                continue
+            if version != self.version:
+                # Bring the similarity index up to date before dropping the responses built from the old one.
+                with self._similarity_lock:
+                    if self.similarity is not None:
+                        try:
+                            self.similarity.refresh(self.db())
+                        except Exception as e:
+                            print(f"Warning: Could not refresh the similarity index: {e}")
+                            self.similarity = None  # Rebuilt in full on the next request
+                with self._lock:
+                    self.entries = OrderedDict()
+                self.names = None
+                self.version = version
+                print(f"Run {version} committed, query cache cleared.")
+
+    def similar(self, names, **options):
+        with self._similarity_lock:
+            if self.similarity is None:
+                self.similarity = SimilarityIndex.from_database(self.db())
+            for name in names:
+                # Saved by a run that is still open (the watcher only refreshes on commits); add its row now.
+                if name not in self.similarity.rows:
+                    record = self.db().get_record(name)
+                    if record is not None:
+                        self.similarity.upsert(record)
+            return self.similarity.query(names, **options)
+
+    def _names(self):
+        names = self.names
+        if names is None:
+            names = self.names = self.db().name_index()
+        return names
+
+    def resolve(self, name):
+        return self._names().resolve(name)
+
+    def suggest(self, name):
+        return self._names().suggest(name)
+
+    def get(self, key, build):
+        with self._lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+        version = self.version
+        body = dumps_record(build(self.db()))
+        with self._lock:
+            if version == self.version:  # Don't store a result built against a run that was just superseded
+                self.entries[key] = body
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return body
+
+LEADERBOARD_FIELDS = ("Name", "Faction", "Affinity", "Rarity", "Rating", "Rank", "Of", "Percentile")
+
+def _leaderboard(params):
+    def build(db):
+        scopes = [(scope, params[scope]) for scope in ("rarity", "affinity") if params.get(scope)]
+        if not params.get("faction") and len(scopes) <= 1:
+            # Served straight from the materialized ranks
+            scope, value = scopes[0] if scopes else ("all", "")
+            rows = db.ranked_leaderboard(params["category"], params["subcategory"], scope, value,
+                                         int(params.get("limit", 10)))
+        else:
+            # Ranked within the filtered champions on the fly
+            rows = db.leaderboard(
+                params["category"], params["subcategory"], int(params.get("limit", 10)),
+                faction=params.get("faction"), affinity=params.get("affinity"), rarity=params.get("rarity"),
+                ranked=True)
+        return [dict(zip(LEADERBOARD_FIELDS, row)) for row in rows]
+    return build
+
+def _search(params):
+    def build(db):
+        rows = db.search(
+            params.get("q"), faction=params.get("faction"), affinity=params.get("affinity"),
+            rarity=params.get("rarity"), limit=int(params.get("limit", 100)))
+        return [{"Name": r[0], "Faction": r[1], "Affinity": r[2], "Rarity": r[3]} for r in rows]
+    return build
+
+def _ranks(cache, name, params):
+    def build(db):
+        resolved = name if db.get_record(name) is not None else cache.resolve(name)
+        if resolved is None:
+            return None
+        rows = db.ranks(resolved, params.get("category"), params.get("subcategory"))
+        return {"Name": resolved, "Ranks": [
+            {"Category": r[0], "Subcategory": r[1], "Scope": r[2], "Group": r[3], "Rating": r[4],
+             "Rank": r[5], "Of": r[6], "Percentile": r[7]} for r in rows]}
+    return build
+
+def _champion(cache, name):
+    def build(db):
+        record = db.get_record(name)
+        if record is None:
+            resolved = cache.resolve(name)
+            record = db.get_record(resolved) if resolved else None
+        return record
+    return build
+
+def _similar(cache, name, params):
+    def build(db):
+        resolved = name if db.get_record(name) is not None else cache.resolve(name)
+        if resolved is None:
+            return None
+        filters = {key: params.get(key) for key in ("faction", "affinity", "rarity")}
+        neighbours = cache.similar([resolved], k=int(params.get("k", 5)), metric=params.get("metric", "cosine"),
+                                   **filters)[resolved]
+        return {"Name": resolved, "Similar": [{"Name": other, "Score": score} for other, score in neighbours]}
+    return build
+
+class ChampionRequestHandler(BaseHTTPRequestHandler):
+    """Read-only JSON API:
+
+    GET /leaderboard?category=Core Areas&subcategory=Demon Lord[&limit=&faction=&affinity=&rarity=]
+    GET /champions/<name>
+    GET /ranks/<name>[?category=&subcategory=]
+    GET /similar/<name>[?k=&metric=&faction=&affinity=&rarity=]
+    GET /search?[q=&faction=&affinity=&rarity=&limit=]
+    GET /stats
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so load tests measure the service rather than TCP setup
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes; don't let them wait on delayed ACKs
+    cache = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        key = (url.path, tuple(sorted(params.items())))
+        try:
+            if url.path == "/leaderboard":
+                if "category" not in params or "subcategory" not in params:
+                    return self._send(400, dumps_record({"error": "category and subcategory are required"}))
+                body = self.cache.get(key, _leaderboard(params))
+            elif url.path == "/search":
+                body = self.cache.get(key, _search(params))
+            elif url.path.startswith("/champions/"):
+                body = self.cache.get(key, _champion(self.cache, unquote(url.path[len("/champions/"):])))
+                if body == b"null":
+                    return self._champion_not_found(url.path)
+            elif url.path.startswith("/ranks/"):
+                body = self.cache.get(key, _ranks(self.cache, unquote(url.path[len("/ranks/"):]), params))
+                if body == b"null":
+                    return self._champion_not_found(url.path)
+            elif url.path.startswith("/similar/"):
+                body = self.cache.get(key, _similar(self.cache, unquote(url.path[len("/similar/"):]), params))
+                if body == b"null":
+                    return self._champion_not_found(url.path)
+            elif url.path == "/stats":
+                body = dumps_record({"version": self.cache.version, "entries": len(self.cache.entries),
+                                     "hits": self.cache.hits, "misses": self.cache.misses})
+            else:
+                return self._send(404, dumps_record({"error": "unknown endpoint"}))
+        except ValueError as e:
+            return self._send(400, dumps_record({"error": str(e)}))
+        except KeyError:
+            return self._champion_not_found(url.path)  # Named champion missing from the similarity index
+        self._send(200, body)
+
+    def _champion_not_found(self, path):
+        # Near misses are offered as suggestions, never answered for: they are usually different champions.
+        name = unquote(path.split("/", 2)[2])
+        return self._send(404, dumps_record({"error": "champion not found", "suggestions": self.cache.suggest(name)}))
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Per-request logging would dominate the cached response time
+
+def make_server(db_path, host="127.0.0.1", port=8080):
+    cache = QueryCache(db_path)
+    cache.start()
+    handler = type("BoundChampionRequestHandler", (ChampionRequestHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def serve(db_path, host="127.0.0.1", port=8080):
+    server = make_server(db_path, host, port)
+    print(f"Serving {db_path} on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.RequestHandlerClass.cache.stop()
+        server.server_close()
+
+def load_test(host, port, paths, requests=10000, concurrency=16):
+    """Replays paths round-robin from concurrent keep-alive clients and reports latency in milliseconds."""
+    per_worker = requests // concurrency
+
+    def worker(offset):
+        conn = http.client.HTTPConnection(host, port)
+        latencies = []
+        for i in range(per_worker):
+            path = paths[(offset + i) % len(paths)]
+            start = time.perf_counter()
+            conn.request("GET", quote(path, safe="/?=&"))
+            conn.getresponse().read()
+            latencies.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = [ms for result in pool.map(worker, range(concurrency)) for ms in result]
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test a running champion query service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    print(load_test(args.host, args.port, [
+        "/leaderboard?category=Core Areas&subcategory=Demon Lord",
+        "/leaderboard?category=Dungeons&subcategory=Dragon&rarity=Epic",
+        "/search?affinity=Void",
+    ], args.requests, args.concurrency))
@@ -0,0 +1,186 @@
+import json
+import os
+import numpy as np
+import champion
+
+# The area ratings Champion.toJson emits under Core Areas, Dungeons, Hard Mode and Doom Tower.
+SIMILARITY_COLUMNS = [
+    (section.CATEGORY, label) for _, section in champion.ChampionRatings.SECTIONS for label, _ in section.FIELDS
+]
+MAX_RATING = 5.0
+
+class SimilarityIndex:
+    """Dense rating vectors for "champions like this one" lookups.
+
+    Vectors are the area ratings scaled to 0..1. Rows are kept in a growable
+    array so a scrape only rewrites the champions it changed; the unit-length
+    copy used for cosine queries is maintained alongside.
+    """
+
+    def __init__(self, columns=None, capacity=512):
+        self.columns = list(columns if columns is not None else SIMILARITY_COLUMNS)
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+        self.vectors = np.zeros((capacity, len(self.columns)), dtype=np.float32)
+        self.units = np.zeros_like(self.vectors)
+        self.norms = np.zeros(capacity, dtype=np.float32)  # Squared lengths, for Euclidean queries
+        self.names = []
+        self.factions = []
+        self.affinities = []
+        self.rarities = []
+        self.rows = {}
+        self.run_id = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def _grow(self):
+        capacity = max(1, len(self.vectors)) * 2
+        for attr in ("vectors", "units", "norms"):
+            old = getattr(self, attr)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, attr, new)
+
+    def upsert(self, record):
+        """Adds or replaces one champion from a Champion.toRecord() payload."""
+        row = self.rows.get(record["Name"])
+        if row is None:
+            row = len(self.names)
+            if row == len(self.vectors):
+                self._grow()
+            self.rows[record["Name"]] = row
+            self.names.append(record["Name"])
+            self.factions.append(None)
+            self.affinities.append(None)
+            self.rarities.append(None)
+        self.factions[row] = record["Faction"]
+        self.affinities[row] = record["Affinity"]
+        self.rarities[row] = record["Rarity"]
+
+        vector = self.vectors[row]
+        for category, subcategory, rating in record["Rows"]:
+            column = self.column_index.get((category, subcategory))
+            if column is not None:
+                vector[column] = (rating or 0.0) / MAX_RATING
+        self._normalize(slice(row, row + 1))
+
+    def _normalize(self, rows):
+        vectors = self.vectors[rows]
+        self.norms[rows] = np.einsum("ij,ij->i", vectors, vectors)
+        lengths = np.sqrt(self.norms[rows])[:, None]
+        self.units[rows] = np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > 0)
+
+    @classmethod
+    def from_database(cls, db):
+        index = cls()
+        index.refresh(db, full=True)
+        return index
+
+    @classmethod
+    def cached(cls, db, path):
+        """Loads the index saved at path, brings it up to date with db and saves it back.
+
+        Falls back to a full build when there is no usable file (missing, or built with other columns).
+        """
+        index = cls.load(path) if os.path.exists(path) else None
+        if index is None or index.columns != SIMILARITY_COLUMNS:
+            index = cls.from_database(db)
+        else:
+            index.refresh(db)
+        index.save(path)
+        return index
+
+    def save(self, path):
+        n = len(self)
+        meta = {"columns": self.columns, "run_id": self.run_id,
+                "champions": [self.names, self.factions, self.affinities, self.rarities]}
+        with open(path, "wb") as f:  # A file object, so numpy doesn't append its own extension
+            np.savez(f, vectors=self.vectors[:n], meta=json.dumps(meta))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            vectors = data["vectors"]
+        names, factions, affinities, rarities = meta["champions"]
+        index = cls([tuple(column) for column in meta["columns"]], capacity=max(1, len(names)))
+        index.vectors[:len(names)] = vectors
+        index._normalize(slice(0, len(names)))
+        index.names, index.factions, index.affinities, index.rarities = names, factions, affinities, rarities
+        index.rows = {name: row for row, name in enumerate(names)}
+        index.run_id = meta["run_id"]
+        return index
+
+    def refresh(self, db, full=False):
+        """Re-reads the champions changed since the last refresh; returns how many.
+
+        A champion counts as changed if a run changed its ratings, it is new, or its
+        faction, affinity or rarity differ from the index. rating_history doesn't track
+        those identity fields, so they are compared against the champions table.
+        """
+        latest = db.latest_run()
+        if full:
+            records = list(db.iter_records())
+        else:
+            names = {row[1] for row in db.changes_since(self.run_id)}
+            for name, faction, affinity, rarity in db.conn.execute(
+                    "SELECT name, faction, affinity, rarity FROM champions"):
+                row = self.rows.get(name)
+                if row is None or (self.factions[row], self.affinities[row], self.rarities[row]) != (
+                        faction, affinity, rarity):
+                    names.add(name)
+            records = [record for record in map(db.get_record, sorted(names)) if record is not None]
+        for record in records:
+            self.upsert(record)
+        self.run_id = latest
+        return len(records)
+
+    def _mask(self, faction=None, affinity=None, rarity=None):
+        n = len(self.names)
+        mask = np.ones(n, dtype=bool)
+        for values, wanted in ((self.factions, faction), (self.affinities, affinity), (self.rarities, rarity)):
+            if wanted:
+                mask &= np.array([value == wanted for value in values], dtype=bool)
+        return mask
+
+    def query(self, names, k=5, metric="cosine", faction=None, affinity=None, rarity=None):
+        """Top-k neighbours for each queried champion, as {name: [(neighbour, score), ...]}.
+
+        Cosine scores are similarities (higher is closer); Euclidean scores are distances
+        (lower is closer). The queried champion is never returned as its own neighbour.
+        """
+        if metric not in ("cosine", "euclidean"):
+            raise ValueError(f"Unknown metric '{metric}'")
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        missing = [name for name in names if name not in self.rows]
+        if missing:
+            raise KeyError(f"Champions not in the index: {', '.join(missing)}")
+
+        n = len(self.names)
+        query_rows = np.array([self.rows[name] for name in names], dtype=np.intp)
+        if metric == "cosine":
+            # Larger is better, so negate to share the "smallest first" selection below.
+            scores = -(self.units[query_rows] @ self.units[:n].T)
+        else:
+            scores = self.norms[query_rows, None] - 2.0 * (self.vectors[query_rows] @ self.vectors[:n].T) + self.norms[None, :n]
+            np.maximum(scores, 0.0, out=scores)
+
+        scores[:, ~self._mask(faction, affinity, rarity)] = np.inf
+        scores[np.arange(len(query_rows)), query_rows] = np.inf
+        k = min(k, n)
+        if k == 0:
+            return {name: [] for name in names}
+        top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = {}
+        for name, rows, row_scores in zip(names, top, top_scores):
+            results[name] = [
+                (self.names[row], float(-score) if metric == "cosine" else float(np.sqrt(score) * MAX_RATING))
+                for row, score in zip(rows, row_scores) if np.isfinite(score)
+            ]
+        return results
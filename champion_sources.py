@@ -0,0 +1,490 @@
+import abc
+import contextlib
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+import champion_names
+import champion_pipeline
+import getPage
+import loadChampion
+
+PENDING = object()  # Source.poll(): the page isn't ready yet
+
+class Source(abc.ABC):
+    """A ratings site: where a champion's page lives, when it is ready, and how to parse it.
+
+    Subclasses set name and implement url(), ready_selectors() and parse(). parse() returns
+    a champion.Champion; fields the site doesn't cover should be left as None so that
+    merging it into the sinks keeps what other sources stored there. Records are tagged
+    with name, and ChampionDatabase.save_rows() lets HellHades' ratings win over the rest.
+    """
+
+    name = None
+    timeout = 10  # Seconds to wait for ready()
+    settle = 0.0  # Extra seconds to sleep once ready, for pages that keep filling in
+
+    def __init__(self, sections=None, base_url=None):
+        self.sections = sections  # loadChampion.SECTIONS to scrape, or None for everything the site has
+        self.base_url = base_url
+
+    @abc.abstractmethod
+    def url(self, champion):
+        pass
+
+    @abc.abstractmethod
+    def ready_selectors(self):
+        """(CSS selector, count) pairs: the page is read once each selector matches at least count elements."""
+
+    def ready(self, driver):
+        return all(len(driver.find_elements(By.CSS_SELECTOR, selector)) >= count
+                   for selector, count in self.ready_selectors())
+
+    def not_found(self, driver):
+        return "Page not found" in driver.title
+
+    @abc.abstractmethod
+    def parse(self, html):
+        pass
+
+    def load(self, driver, champion):
+        """Navigates driver to the champion's page and returns its HTML, or None if it isn't there."""
+        driver.get(self.url(champion))
+        if self.not_found(driver):
+            print(f"Champion '{champion}' does not exist on {self.name}. Skipping...")
+            return None
+        WebDriverWait(driver, self.timeout).until(self.ready)
+        if self.settle:
+            time.sleep(self.settle)
+        return driver.page_source
+
+    def navigate(self, driver, champion):
+        """Starts loading the champion's page without waiting for it (for drivers with page_load_strategy "none")."""
+        # Tag the outgoing document so poll() can't mistake it for the new page before navigation commits.
+        driver.execute_script("window.__championStale = true")
+        driver.get(self.url(champion))
+
+    def poll(self, driver):
+        """Non-blocking check after navigate(): the HTML once ready, None if the page doesn't exist, else PENDING."""
+        if driver.execute_script("return window.__championStale === true"):
+            return PENDING
+        if self.not_found(driver):
+            return None
+        if self.ready(driver):
+            return driver.page_source
+        return PENDING
+
+class SourcedChampion:
+    """A parsed Champion and the source it came from; its record carries a "Source" key for the database merge."""
+
+    __slots__ = ("champion", "source")
+
+    def __init__(self, champion, source):
+        self.champion = champion
+        self.source = source
+
+    def toRecord(self):
+        return dict(self.champion.toRecord(), Source=self.source)
+
+class HellHadesSource(Source):
+    name = "hellhades"  # champion_database.PRIMARY_SOURCE
+
+    def __init__(self, sections=None, base_url=None):
+        super().__init__(sections, base_url)
+        self.settle = 2.0 if sections is None else 0.0  # As in getPage.get_hellhades_page
+
+    def url(self, champion):
+        return getPage.champion_url(champion, self.base_url)
+
+    def ready_selectors(self):
+        return getPage.section_selectors(self.sections) if self.sections else [(".raid-ratings-list", 1)]
+
+    def parse(self, html):
+        return loadChampion.load_hell_Hades(html, self.sections)
+
+SOURCES = {source.name: source for source in (HellHadesSource,)}
+
+class BrowserPool:
+    """Up to size headless Chrome instances, started on demand and reused across pages and sources."""
+
+    def __init__(self, size=1):
+        self.size = max(1, size)
+        self.workers = self.size  # Pages that can load at once
+        self.idle = []
+        self.started = 0
+        self._available = threading.Condition()
+
+    def _acquire(self):
+        with self._available:
+            while not self.idle and self.started >= self.size:
+                self._available.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.started += 1
+        try:
+            return webdriver.Chrome(options=getPage.headless_options())  # Outside the lock; Chrome takes a while
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._available:
+            self.started -= 1
+            self._available.notify()
+
+    @contextlib.contextmanager
+    def driver(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        except TimeoutException:
+            self._return(driver)  # A slow page, not a broken browser
+            raise
+        except Exception:
+            # The browser may be wedged or gone; replace it rather than hand it on.
+            self._release_slot()
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            raise
+        self._return(driver)
+
+    def _return(self, driver):
+        with self._available:
+            self.idle.append(driver)
+            self._available.notify()
+
+    def load(self, source, champion):
+        with self.driver() as driver:
+            return source.load(driver, champion)
+
+    def stats(self):
+        return {"browsers": self.started}
+
+    def close(self):
+        """Quits the idle browsers; ones still checked out are returned and reused as usual."""
+        with self._available:
+            drivers, self.idle = self.idle, []
+            self.started -= len(drivers)
+            self._available.notify_all()
+        for driver in drivers:
+            driver.quit()
+
+class _Tab:
+    def __init__(self, handle):
+        self.handle = handle
+        self.job = None  # (source, champion, future) being loaded
+        self.deadline = 0.0
+        self.ready_at = None  # When poll() first saw the page ready, for the source's settle time
+        self.pages = 0
+
+class TabbedBrowser:
+    """One headless Chrome loading up to tabs pages at once, driven from a single thread.
+
+    Pages load with page_load_strategy "none": the thread starts a navigation in every
+    free tab, then polls each tab's readiness in turn, so the waits overlap instead of
+    queueing behind each other. A tab is closed and replaced after max_pages pages or
+    once its JavaScript heap passes max_heap_mb, which keeps long runs from leaking.
+    """
+
+    def __init__(self, jobs, tabs=4, max_pages=50, max_heap_mb=256, poll_interval=0.05, driver_factory=None):
+        self.jobs = jobs
+        self.driver_factory = driver_factory or webdriver.Chrome  # Called with options=; tab_benchmark swaps in a fake
+        self.tab_count = max(1, tabs)
+        self.max_pages = max_pages
+        self.max_heap = max_heap_mb * 1024 * 1024 if max_heap_mb else None
+        self.poll_interval = poll_interval
+        self.recycled = 0
+        self.driver = None
+        self.tabs = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tabbed-browser", daemon=True)
+        self._thread.start()
+
+    def _start(self):
+        chrome_options = getPage.headless_options()
+        chrome_options.page_load_strategy = "none"
+        # Only one tab is in front; keep Chrome from throttling the timers and renderers of the others.
+        for flag in ("--disable-background-timer-throttling", "--disable-renderer-backgrounding",
+                     "--disable-backgrounding-occluded-windows"):
+            chrome_options.add_argument(flag)
+        self.driver = self.driver_factory(options=chrome_options)
+        self.tabs = [_Tab(self.driver.current_window_handle)]
+        while len(self.tabs) < self.tab_count:
+            self.driver.switch_to.new_window("tab")
+            self.tabs.append(_Tab(self.driver.current_window_handle))
+
+    def _recycle(self, tab):
+        # Open the replacement first: closing a browser's last tab would end the session.
+        self.driver.switch_to.new_window("tab")
+        handle = self.driver.current_window_handle
+        self.driver.switch_to.window(tab.handle)
+        self.driver.close()
+        self.driver.switch_to.window(handle)
+        tab.handle, tab.pages = handle, 0
+        self.recycled += 1
+
+    def _leaking(self, tab):
+        if self.max_pages and tab.pages >= self.max_pages:
+            return True
+        if self.max_heap:
+            heap = self.driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : 0")
+            return heap > self.max_heap
+        return False
+
+    def _finish(self, tab, html):
+        _, _, future = tab.job
+        tab.job, tab.ready_at = None, None
+        tab.pages += 1
+        future.set_result(html)
+        if self._leaking(tab):
+            self._recycle(tab)
+
+    def _step(self, tab):
+        # Advances one tab; returns True if it did anything besides wait.
+        self.driver.switch_to.window(tab.handle)
+        if tab.job is None:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                return False
+            source, champion, future = job
+            if not future.set_running_or_notify_cancel():
+                return True
+            tab.job, tab.deadline = job, time.monotonic() + source.timeout
+            source.navigate(self.driver, champion)
+            return True
+
+        source, champion, _ = tab.job
+        if tab.ready_at is not None:
+            if time.monotonic() - tab.ready_at < source.settle:
+                return False
+            self._finish(tab, self.driver.page_source)
+            return True
+        try:
+            html = source.poll(self.driver)
+        except WebDriverException:
+            html = PENDING  # The document is mid-navigation; try again next round
+        if html is PENDING:
+            if time.monotonic() < tab.deadline:
+                return False
+            print(f"Timeout waiting for {source.name} page of '{champion}'.")
+            html = None
+        elif html is None:
+            print(f"Champion '{champion}' does not exist on {source.name}. Skipping...")
+        elif source.settle:
+            tab.ready_at = time.monotonic()
+            return True
+        self._finish(tab, html)
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.driver is None:
+                    self._start()
+                busy = False
+                for tab in self.tabs:
+                    busy |= self._step(tab)
+                if not busy:
+                    time.sleep(self.poll_interval)
+            except Exception as e:
+                # The browser itself failed: fail what it was loading and start a fresh one.
+                print(f"Browser failed, restarting it: {e}")
+                failed = [tab.job for tab in self.tabs if tab.job is not None]
+                if self.driver is None:  # Chrome wouldn't start; fail a queued job so callers don't wait forever
+                    with contextlib.suppress(queue.Empty):
+                        failed.append(self.jobs.get_nowait())
+                for _, _, future in failed:
+                    if not future.done():
+                        future.set_exception(e)
+                self._quit()
+                if self._stop.wait(1.0):
+                    break
+        self._quit()
+
+    def _quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver, self.tabs = None, []
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+class TabPool:
+    """browsers TabbedBrowsers sharing one job queue; a drop-in for BrowserPool in SourceEngine.
+
+    load() blocks its caller until a tab has the page, so the engine runs browsers * tabs
+    fetch workers to keep every tab busy.
+    """
+
+    def __init__(self, browsers=1, tabs=4, max_pages=50, max_heap_mb=256, driver_factory=None):
+        self.jobs = queue.Queue()
+        self.options = {"tabs": tabs, "max_pages": max_pages, "max_heap_mb": max_heap_mb,
+                        "driver_factory": driver_factory}
+        self.browser_count = max(1, browsers)
+        self.workers = self.browser_count * max(1, tabs)
+        self.browsers = []
+        self.started = 0
+        self.recycled = 0  # Tabs replaced by browsers that have since been closed
+        self._lock = threading.Lock()
+
+    def load(self, source, champion):
+        with self._lock:
+            if not self.browsers:  # Started on first use, and again after close()
+                self.browsers = [TabbedBrowser(self.jobs, **self.options) for _ in range(self.browser_count)]
+                self.started += self.browser_count
+        future = Future()
+        self.jobs.put((source, champion, future))
+        return future.result()
+
+    def stats(self):
+        with self._lock:
+            recycled = self.recycled + sum(browser.recycled for browser in self.browsers)
+        return {"browsers": self.started, "tabs_recycled": recycled}
+
+    def close(self):
+        with self._lock:
+            browsers, self.browsers = self.browsers, []
+        for browser in browsers:
+            browser.close()
+        with self._lock:
+            self.recycled += sum(browser.recycled for browser in browsers)
+
+class RateLimiter:
+    """Spaces requests to the same host at least 1 / rate seconds apart, across every thread."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        time.sleep(slot - now)
+
+class PageCache:
+    """Fetched pages on disk as <directory>/<source>/<slug>.html, reused while younger than ttl seconds.
+
+    A source's folder has the same layout as getPage's record_dir, so it can be replayed
+    with champion_mock or re-parsed with --reparse. Pages fetched for --sections only waited
+    for those sections, so they go in their own folder, e.g. hellhades+doom-tower+overall.
+    """
+
+    def __init__(self, directory, ttl=None):
+        self.directory = directory
+        self.ttl = ttl
+
+    def path(self, source, champion):
+        folder = source.name
+        if source.sections:
+            folder = "+".join([folder] + sorted(champion_names.slugify(section) for section in source.sections))
+        return os.path.join(self.directory, folder, f"{champion_names.slugify(champion)}.html")
+
+    def get(self, source, champion):
+        path = self.path(source, champion)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, source, champion, html):
+        getPage.record_page(os.path.dirname(self.path(source, champion)), champion, html)
+
+class SourceEngine:
+    """Fetches and parses every champion from every source through one shared set of resources.
+
+    All sources draw on the same browser pool (BrowserPool or TabPool), rate limiter (per host), page cache and
+    sinks, and run through a single StreamingPipeline, so a second source adds pages to
+    the same queues instead of a second pipeline. Pages are interleaved by champion, so
+    consecutive fetches usually go to different hosts.
+    """
+
+    STATS = ("fetched", "cache_hits", "fetch_failed", "parsed", "parse_failed", "fetch_seconds")
+
+    def __init__(self, sources, pool=None, limiter=None, cache=None):
+        self.sources = {source.name: source for source in sources}
+        self.pool = pool or BrowserPool()
+        self.limiter = limiter or RateLimiter()
+        self.cache = cache
+        self.source_stats = {name: dict.fromkeys(self.STATS, 0) for name in self.sources}
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def _count(self, source, key, amount=1):
+        with self._lock:
+            self.source_stats[source.name][key] += amount
+
+    def fetch(self, item):
+        """Pipeline fetch step: (source name, champion) -> (source, html), or None."""
+        source_name, name = item
+        source = self.sources[source_name]
+        html = self.cache.get(source, name) if self.cache else None
+        if html is not None:
+            self._count(source, "cache_hits")
+            return source, html
+
+        self.limiter.wait(urlsplit(source.url(name)).netloc)
+        start = time.perf_counter()
+        try:
+            html = self.pool.load(source, name)
+        except Exception as e:
+            print(f"Failed to retrieve {source.name} page for {name}: {e}")
+            html = None
+        self._count(source, "fetch_seconds", time.perf_counter() - start)
+        if not html:
+            self._count(source, "fetch_failed")
+            return None
+        self._count(source, "fetched")
+        if self.cache:
+            self.cache.put(source, name, html)
+        return source, html
+
+    def parse(self, page):
+        """Pipeline parse step: (source, html) -> Champion."""
+        source, html = page
+        champion = source.parse(html)
+        self._count(source, "parsed" if champion is not None else "parse_failed")
+        return SourcedChampion(champion, source.name) if champion is not None else None
+
+    def run(self, names, sinks, fetch_workers=None, queue_size=4):
+        """Streams every (champion, source) pair into sinks; returns the pipeline stats with a per-source breakdown."""
+        names = list(names)
+        items = ((source, name) for name in names for source in self.sources)
+        pipeline = champion_pipeline.StreamingPipeline(sinks, fetch=self.fetch, parse=self.parse,
+                                                       fetch_workers=fetch_workers or self.pool.workers,
+                                                       queue_size=queue_size)
+        start = time.perf_counter()
+        try:
+            stats = pipeline.run(items)
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.pool.close()
+        return dict(stats, sources=self.stats(), pool=self.pool.stats())
+
+    def stats(self):
+        """Per-source counters plus pages per second (fetched and cached) over the engine's run time."""
+        with self._lock:
+            stats = {name: dict(counts) for name, counts in self.source_stats.items()}
+        for counts in stats.values():
+            counts["pages_per_second"] = (counts["fetched"] + counts["cache_hits"]) / self.elapsed if self.elapsed else 0.0
+        return stats
@@ -0,0 +1,183 @@
+import numpy as np
+import champion
+
+class _Interned:
+    # A string column stored as int32 codes into a shared vocabulary; None is code -1.
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code):
+        return self.values[code] if code >= 0 else None
+
+class RatingsTable:
+    """Ratings for many champions (or many run snapshots of them) in one contiguous float32 matrix.
+
+    Each row is one champion snapshot and each column one champion.RATING_COLUMNS entry,
+    so a category's columns are adjacent and category() hands them out as a view, not a
+    copy. Name, faction, affinity and rarity are int32 codes into shared vocabularies, and
+    run holds the run a snapshot was taken after (-1 when unknown). Ratings a partial
+    scrape left as None are NaN.
+    """
+
+    STRING_COLUMNS = ("name", "faction", "affinity", "rarity")
+    PRECISION = 2  # Decimal places ratings are published with; float32 values are rounded back to it
+
+    def __init__(self, capacity=256):
+        self.columns = list(champion.RATING_COLUMNS)
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+        self.spans = {}  # Category -> (first column, end column)
+        for i, (category, _) in enumerate(self.columns):
+            first, _ = self.spans.get(category, (i, i))
+            self.spans[category] = (first, i + 1)
+        self.ratings = np.full((capacity, len(self.columns)), np.nan, dtype=np.float32)
+        self.codes = np.full((capacity, len(self.STRING_COLUMNS)), -1, dtype=np.int32)
+        self.runs = np.full(capacity, -1, dtype=np.int32)
+        self.vocab = {column: _Interned() for column in self.STRING_COLUMNS}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        capacity = max(1, len(self.ratings)) * 2
+        for attr, fill in (("ratings", np.nan), ("codes", -1), ("runs", -1)):
+            old = getattr(self, attr)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, attr, new)
+
+    def _append_row(self, strings, run):
+        if self.size == len(self.ratings):
+            self._grow()
+        row = self.size
+        self.codes[row] = [self.vocab[column].encode(value) for column, value in zip(self.STRING_COLUMNS, strings)]
+        self.runs[row] = -1 if run is None else run
+        self.size += 1
+        return row
+
+    def append_record(self, record, run=None):
+        """Adds a Champion.toRecord() payload as a new row; returns the row index."""
+        row = self._append_row((record["Name"], record["Faction"], record["Affinity"], record["Rarity"]), run)
+        for category, subcategory, rating in record["Rows"]:
+            column = self.column_index.get((category, subcategory))
+            if column is not None and rating is not None:
+                self.ratings[row, column] = rating
+        return row
+
+    def append(self, this_champion, run=None):
+        """Adds a Champion as a new row; returns the row index."""
+        return self.append_record(this_champion.toRecord(), run)
+
+    @classmethod
+    def from_champions(cls, champions, run=None):
+        table = cls()
+        for this_champion in champions:
+            table.append(this_champion, run)
+        return table
+
+    @classmethod
+    def from_database(cls, db):
+        """One row per stored champion, with its current ratings."""
+        table = cls()
+        run = db.latest_run()
+        for record in db.iter_records():
+            table.append_record(record, run)
+        return table
+
+    @classmethod
+    def from_history(cls, db):
+        """One row per champion per run that changed it, holding its full ratings as of that run.
+
+        rating_history only stores the values a run changed, so values are carried
+        forward from the champion's previous snapshot.
+        """
+        table = cls()
+        cursor = db.conn.execute("""
+            SELECT champions.champion_id, champions.name, champions.faction, champions.affinity, champions.rarity,
+                   rating_history.run_id, rating_history.category, rating_history.subcategory, rating_history.rating
+            FROM rating_history
+            JOIN champions ON champions.champion_id = rating_history.champion_id
+            ORDER BY champions.champion_id, rating_history.run_id
+        """)
+        current = None
+        for champion_id, name, faction, affinity, rarity, run_id, category, subcategory, rating in cursor:
+            if current != (champion_id, run_id):
+                previous = row if current is not None and current[0] == champion_id else None
+                row = table._append_row((name, faction, affinity, rarity), run_id)
+                if previous is not None:
+                    table.ratings[row] = table.ratings[previous]
+                current = (champion_id, run_id)
+            column = table.column_index.get((category, subcategory))
+            if column is not None and rating is not None:
+                table.ratings[row, column] = rating
+        return table
+
+    def category(self, category):
+        """(rows x subcategories) view of one category's ratings; writes go straight to the table."""
+        first, end = self.spans[category]
+        return self.ratings[:self.size, first:end]
+
+    def subcategories(self, category):
+        first, end = self.spans[category]
+        return [subcategory for _, subcategory in self.columns[first:end]]
+
+    def column(self, category, subcategory):
+        """View of one rating across every row."""
+        return self.ratings[:self.size, self.column_index[(category, subcategory)]]
+
+    def strings(self, column):
+        """Decoded values of a string column ("name", "faction", "affinity" or "rarity") for every row."""
+        vocab = self.vocab[column]
+        return [vocab.decode(code) for code in self.codes[:self.size, self.STRING_COLUMNS.index(column)]]
+
+    def mask(self, column, value):
+        """Boolean row mask for a string column equal to value, compared on codes."""
+        code = self.vocab[column].codes.get(value)
+        if code is None:
+            return np.zeros(self.size, dtype=bool)
+        return self.codes[:self.size, self.STRING_COLUMNS.index(column)] == code
+
+    def to_champion(self, row):
+        """Rebuilds a Champion from a row. Unscraped values come back as None, as from a partial scrape.
+
+        Ratings are rounded to PRECISION, so a stored 4.3 comes back as 4.3 rather than its float32 neighbour.
+        """
+        if not 0 <= row < self.size:
+            raise IndexError(f"Row {row} is out of range")
+        name, faction, affinity, rarity = (
+            self.vocab[column].decode(code) for column, code in zip(self.STRING_COLUMNS, self.codes[row]))
+        values = self.ratings[row]
+        ratings = champion.ChampionRatings()
+        overall = values[self.column_index[('Overall', 'Overall Rating')]]
+        book = values[self.column_index[('Overall', 'Book Value')]]
+        ratings.overall = None if np.isnan(overall) else round(float(overall), self.PRECISION)
+        ratings.book = None if np.isnan(book) else int(book)
+        for attr, section in champion.ChampionRatings.SECTIONS:
+            first, end = self.spans[section.CATEGORY]
+            if np.isnan(values[first:end]).all():
+                setattr(ratings, attr, None)
+                continue
+            section_ratings = section()
+            for (_, field), value in zip(section.FIELDS, values[first:end]):
+                setattr(section_ratings, field, None if np.isnan(value) else round(float(value), self.PRECISION))
+            setattr(ratings, attr, section_ratings)
+        return champion.Champion(name, faction, affinity, rarity, ratings)
+
+    def __iter__(self):
+        for row in range(self.size):
+            yield self.to_champion(row)
+
+    def nbytes(self):
+        """Memory held by the arrays (at their current capacity) and the interned vocabularies."""
+        arrays = self.ratings.nbytes + self.codes.nbytes + self.runs.nbytes
+        return arrays + sum(len(value) for vocab in self.vocab.values() for value in vocab.values)
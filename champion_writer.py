@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from champion_database import ChampionDatabase
+
+_STOP = object()
+
+class _Flush:
+    # Queue marker: set once every record queued before it has been committed.
+    def __init__(self):
+        self.done = threading.Event()
+
+class WriteBehindWriter:
+    """Persists champion records on a dedicated thread that owns the SQLite connection.
+
+    write() only enqueues, so fetchers never wait on the disk. The writer thread takes
+    whatever has queued up (at most batch_size records) and commits it as one transaction.
+    Guarantees: after flush() returns, every record written before the call is committed;
+    after close() returns, everything is committed and the connection is closed.
+    Records are lost only if the process dies before one of those returns.
+    """
+
+    def __init__(self, db_path, run_id=None, batch_size=64, max_queue=10000):
+        self.db_path = db_path
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self.queue = queue.Queue(max_queue)  # Bounded only as a memory backstop
+        self.error = None
+        self._stats = {"records": 0, "batches": 0, "failed": 0, "commit_ms_total": 0.0, "commit_ms_max": 0.0,
+                       "commit_ms_last": 0.0}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="champion-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        if self.error is not None:
+            raise RuntimeError("Write-behind writer has stopped") from self.error
+        self.queue.put(record)
+
+    def flush(self, timeout=None):
+        """Blocks until everything written so far is committed; returns False on timeout."""
+        marker = _Flush()
+        self.queue.put(marker)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not marker.done.wait(0.1):
+            if not self._thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                return marker.done.is_set()
+        return True
+
+    def close(self, timeout=None):
+        """Commits whatever is queued, stops the thread and closes the connection."""
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError(f"Writer still has {self.queue.qsize()} records queued")
+        if self.error is not None:
+            raise RuntimeError("Write-behind writer failed") from self.error
+
+    def stats(self):
+        """Queue depth and commit latency, safe to call from any thread."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self.queue.qsize()
+        stats["commit_ms_avg"] = stats["commit_ms_total"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+    def _run(self):
+        try:
+            db = ChampionDatabase(db_name=self.db_path)
+        except Exception as e:
+            self.error = e
+            self._drain_markers()
+            return
+        db.run_id = self.run_id
+        try:
+            stopping = False
+            while not stopping:
+                batch, markers = [], []
+                item = self.queue.get()
+                # Group commit: take everything already waiting, up to batch_size records
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    elif isinstance(item, _Flush):
+                        markers.append(item)
+                    else:
+                        batch.append(item)
+                    if stopping or len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._commit(db, batch)
+                for marker in markers:
+                    marker.done.set()
+        except Exception as e:
+            self.error = e
+            print(f"Write-behind writer stopped: {e}")
+            self._drain_markers()
+        finally:
+            db.run_id = None
+            db.close()
+
+    def _commit(self, db, batch):
+        start = time.perf_counter()
+        failed = 0
+        try:
+            for record in batch:
+                db.save_record(record, commit=False)
+            db.conn.commit()
+        except Exception as e:
+            # Don't let one bad record take the whole batch down: retry them one transaction each
+            db.conn.rollback()
+            print(f"Warning: Batch commit failed ({e}); retrying records individually.")
+            for record in batch:
+                try:
+                    db.save_record(record)
+                except Exception as record_error:
+                    db.conn.rollback()
+                    failed += 1
+                    print(f"Failed to save champion {record.get('Name')}: {record_error}")
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats["records"] += len(batch) - failed
+            self._stats["failed"] += failed
+            self._stats["batches"] += 1
+            self._stats["commit_ms_total"] += elapsed
+            self._stats["commit_ms_last"] = elapsed
+            self._stats["commit_ms_max"] = max(self._stats["commit_ms_max"], elapsed)
+
+    def _drain_markers(self):
+        # Release anyone blocked in flush() once the writer can no longer make progress
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, _Flush):
+                item.done.set()
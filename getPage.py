@@ -3,16 +3,69 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import base64
+import json
+import os
+import re
 import time
+import champion
+import champion_names
+import loadChampion
 
-def get_hellhades_page(champion):
-    url = f"https://hellhades.com/raid/champions/{champion.lower().replace(" ","-")}/"
-    
-    # Set up Selenium with headless Chrome
+BASE_URL = "https://hellhades.com"
+
+def champion_url(champion, base_url=None):
+    # base_url points the scraper at another host serving the same paths, e.g. champion_mock's replay server.
+    return f"{(base_url or BASE_URL).rstrip('/')}/raid/champions/{champion_names.slugify(champion)}/"
+
+_SCRIPT = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+_SITE_URL = re.compile(r"(?:https?:)?//(?:www\.)?hellhades\.com(?![\w.-])/?", re.IGNORECASE)
+
+def replay_html(html):
+    # The rendered DOM already holds the ratings, so scripts are dropped rather than run again on replay, and
+    # absolute links to the site become root-relative, so assets go to whichever host serves the recording.
+    return _SITE_URL.sub("/", _SCRIPT.sub("", html))
+
+def record_page(record_dir, champion, html):
+    # Recordings are named by slug, which is what champion_mock serves them under (and --reparse reads *.html).
+    os.makedirs(record_dir, exist_ok=True)
+    with open(os.path.join(record_dir, f"{champion_names.slugify(champion)}.html"), "w", encoding="utf-8") as f:
+        f.write(replay_html(html))
+
+def headless_options():
+    # Headless Chrome options shared by every fetcher (and champion_sources' browser pool).
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
+    return chrome_options
+
+def section_selectors(sections):
+    # (CSS selector, count) pairs that are all satisfied once the given sections have rendered. Every rating row
+    # must be there: a row missing at parse time would be saved as its default 0.0 over the stored value.
+    selectors = []
+    for section in sections:
+        if section == loadChampion.OVERALL_SECTION:
+            selectors.append((".raid-ratings-overall .raid-rating", 1))  # The book value is optional
+        else:
+            attr, _, container, _ = loadChampion.RATING_SECTIONS[section]
+            rows = len(dict(champion.ChampionRatings.SECTIONS)[attr].FIELDS)
+            selectors.append((f"#{container} .raid-ratings-list .raid-rating", rows))
+    return selectors
+
+def sections_rendered(driver, sections):
+    return all(len(driver.find_elements(By.CSS_SELECTOR, selector)) >= count
+               for selector, count in section_selectors(sections))
+
+def get_hellhades_page(champion, sections=None, base_url=None, record_dir=None):
+    """Rendered HTML for a champion. With sections, waits only until those sections have rendered.
+
+    record_dir saves every page fetched for replay by champion_mock.
+    """
+    url = champion_url(champion, base_url)
+    
+    # Set up Selenium with headless Chrome
+    chrome_options = headless_options()
 
     # You might need to specify the path to chromedriver if it's not in your PATH.
     driver = webdriver.Chrome(options=chrome_options)
@@ -22,22 +75,96 @@ def get_hellhades_page(champion):
     
     if "Page not found" in driver.page_source:
         print(f"Champion '{champion}' does not exist. Skipping...")
+        driver.quit()
         return None  # Exit early
 
     # Wait for the ratings list to load (adjust the timeout as needed)
     try:
-        element_present = EC.presence_of_element_located((By.CLASS_NAME, "raid-ratings-list"))
+        if sections is None:
+            element_present = EC.presence_of_element_located((By.CLASS_NAME, "raid-ratings-list"))
+        else:
+            element_present = lambda driver: sections_rendered(driver, sections)
         WebDriverWait(driver, 10).until(element_present)
     except Exception as e:
         print(f"Timeout waiting for dynamic content on champion '{champion}':", e)
         driver.quit()
         return None
 
-    # Optionally, wait a moment extra for safety
-    time.sleep(2)
+    # Optionally, wait a moment extra for safety. A section scrape already waited for every row it parses.
+    if sections is None:
+        time.sleep(2)
     
     # Get the fully rendered HTML page
     html = driver.page_source
     driver.quit()
+    if record_dir:
+        record_page(record_dir, champion, html)
 
     return html
+
+def _json_response(response):
+    mime_type = response.get("mimeType", "")
+    return "json" in mime_type or response.get("url", "").split("?", 1)[0].endswith(".json")
+
+def fetch_champion(champion, url=None, timeout=10, sections=None, base_url=None):
+    """Fetches a champion, preferring the structured ratings response over the rendered DOM.
+
+    Chrome's DevTools network events are read while the page loads. The first JSON
+    response that loadChampion.load_from_payload can map returns the Champion at once,
+    without waiting for rendering. If the ratings list renders (or the timeout passes)
+    without such a response, the rendered HTML is parsed the usual way. With sections,
+    only those sections are kept (or waited for and parsed). `champion_mock.py DIR --capture`
+    serves a local stand-in page and ratings feed (see fixtures/capture) to point base_url at.
+    """
+    url = url or champion_url(champion, base_url)
+
+    chrome_options = headless_options()
+    chrome_options.page_load_strategy = "none"  # driver.get returns immediately; we decide when we're done
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.get(url)
+
+        json_requests = {}
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for entry in driver.get_log("performance"):
+                message = json.loads(entry["message"])["message"]
+                method, params = message.get("method"), message.get("params", {})
+                if method == "Network.responseReceived" and _json_response(params.get("response", {})):
+                    json_requests[params["requestId"]] = params["response"].get("url")
+                elif method == "Network.loadingFinished" and params.get("requestId") in json_requests:
+                    try:
+                        body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                        data = body["body"]
+                        if body.get("base64Encoded"):
+                            data = base64.b64decode(data)
+                        payload_champion = loadChampion.load_from_payload(json.loads(data))
+                    except Exception as e:
+                        print(f"Warning: Could not read response {json_requests[params['requestId']]}: {e}")
+                        continue
+                    if payload_champion:
+                        if sections is not None:
+                            loadChampion.keep_sections(payload_champion, sections)
+                        return payload_champion
+
+            if sections is None and driver.find_elements(By.CLASS_NAME, "raid-ratings-list"):
+                break  # Rendered, and no payload we recognise arrived first
+            if sections is not None and sections_rendered(driver, sections):
+                break  # Rendered, and no payload we recognise arrived first
+            if "Page not found" in driver.title:  # Cheaper than serializing page_source every poll
+                print(f"Champion '{champion}' does not exist. Skipping...")
+                return None
+            time.sleep(0.1)
+        else:
+            print(f"Timeout waiting for ratings on champion '{champion}'.")
+            return None
+
+        # The ratings list is in the DOM but may still be filling in, as in get_hellhades_page
+        if sections is None:
+            time.sleep(2)
+        return loadChampion.load_hell_Hades(driver.page_source, sections)
+    finally:
+        driver.quit()
@@ -1,6 +1,8 @@
 from bs4 import BeautifulSoup
+import argparse
 import os
 import champion
+import champion_names
 import re
 
 def is_numeric(s):
@@ -33,6 +35,11 @@ def getFactionFromSource(faction_source):
 
     if faction_key in faction_map:
         return faction_map[faction_key]
+    # Plain faction names (e.g. "Demon Spawn" in a data feed) match the keys once both are normalized
+    faction_key = champion_names.normalize_name(faction_key)
+    for key, faction in faction_map.items():
+        if faction_key in (champion_names.normalize_name(key), champion_names.normalize_name(faction)):
+            return faction
     print("Warning: Could not determine faction from source:", faction_source)
     return None
 
@@ -396,57 +403,182 @@ def getFactionWarsRatings(soup):
 
     return factionWarsRatings
 
-def load_hell_Hades(html):
-    this_champion = champion.Champion()
+def load_hell_Hades(html, sections=None):
     soup = BeautifulSoup(html, "html.parser")
-    
+    try:
+        return build_champion(soup, sections)
+    finally:
+        # Break the tree's parent/child reference cycles so it is freed now rather than at the next GC pass
+        soup.decompose()
+
+# Sections that can be scraped on their own. "Overall" covers the overall rating and book value;
+# the rating categories map to (ratings attribute, extractor, container id, warning label).
+OVERALL_SECTION = "Overall"
+RATING_SECTIONS = {
+    "Core Areas": ("core", getCoreRatings, "key-areas", "Core ratings"),
+    "Dungeons": ("dungeons", getDungeonRatings, "dungeons", "Dungeon ratings"),
+    "Hard Mode": ("hard_mode", getHardModeRatings, "hard-mode", "Hard mode ratings"),
+    "Doom Tower": ("doom_tower", getDoomTowerRatings, "doom-tower", "Doom tower ratings"),
+}
+SECTIONS = [OVERALL_SECTION] + list(RATING_SECTIONS)
+
+def parse_sections(text):
+    """Parses a comma separated section list such as "Doom Tower, Overall"; None means everything."""
+    if not text:
+        return None
+    sections = [part.strip() for part in text.split(",") if part.strip()]
+    unknown = [section for section in sections if section not in SECTIONS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown sections {unknown}; choose from {SECTIONS}")
+    return sections
+
+def build_champion(soup, sections=None):
+    # With sections, only those extractors run. Everything else (including faction, affinity and
+    # rarity) is left as None, which the sinks treat as "keep what is stored".
+    this_champion = champion.Champion()
+
     this_champion.name = getName(soup)
     if not this_champion.name:
         print("Warning: Champion name could not be determined.")
         return None
 
-    this_champion.faction, this_champion.affinity = getFactionAffinity(soup)
-    if not this_champion.faction or not this_champion.affinity:
-        print("Warning: Champion faction or affinity could not be determined.")
-        return None
-    
-    rarity, book_value = getRarityAndBookValue(soup)
-    this_champion.rarity = rarity
-    if not this_champion.rarity:
-        print(f"Warning: Champion {this_champion.name} rarity could not be determined.")
-    
-    this_champion.ratings.book = book_value
-    if this_champion.ratings.book is None:
-        print(f"Warning: Champion {this_champion.name} book value could not be determined.")
+    if sections is None:
+        this_champion.faction, this_champion.affinity = getFactionAffinity(soup)
+        if not this_champion.faction or not this_champion.affinity:
+            print("Warning: Champion faction or affinity could not be determined.")
+            return None
+    else:
+        this_champion.faction = this_champion.affinity = this_champion.rarity = None
+
+    if sections is None or OVERALL_SECTION in sections:
+        rarity, book_value = getRarityAndBookValue(soup)
+        this_champion.rarity = rarity if sections is None else None
+        if not rarity:
+            print(f"Warning: Champion {this_champion.name} rarity could not be determined.")
+
+        this_champion.ratings.book = book_value
+        if this_champion.ratings.book is None:
+            print(f"Warning: Champion {this_champion.name} book value could not be determined.")
+
+        this_champion.ratings.overall = getOverallRating(soup)
+        if this_champion.ratings.overall is None:
+            print("Warning: Overall rating could not be determined.")
+            return None
+    else:
+        this_champion.ratings.overall = this_champion.ratings.book = None
+
+    for category, (attr, extractor, _, label) in RATING_SECTIONS.items():
+        if sections is not None and category not in sections:
+            setattr(this_champion.ratings, attr, None)
+            continue
+        ratings = extractor(soup)
+        if not ratings:
+            print(f"Warning: {label} could not be determined.")
+            return None
+        setattr(this_champion.ratings, attr, ratings)
 
-    this_champion.ratings.overall = getOverallRating(soup)
-    if this_champion.ratings.overall is None:
-        print("Warning: Overall rating could not be determined.")
-        return None
+    # this_champion.ratings.faction_wars = getFactionWarsRatings(soup)
+    # if not this_champion.ratings.faction_wars:
+    #     print("Warning: Faction wars ratings could not be determined.")
+    #     return None
 
-    this_champion.ratings.core = getCoreRatings(soup)
-    if not this_champion.ratings.core:
-        print("Warning: Core ratings could not be determined.")
-        return None
+    return this_champion
 
-    this_champion.ratings.dungeons = getDungeonRatings(soup)
-    if not this_champion.ratings.dungeons:
-        print("Warning: Dungeon ratings could not be determined.")
+# Section names as they may appear as keys in a structured ratings payload, normalized with champion_names.
+PAYLOAD_SECTIONS = {
+    "coreareas": champion.CoreRatings, "keyareas": champion.CoreRatings, "core": champion.CoreRatings,
+    "dungeons": champion.DungeonRatings,
+    "hardmode": champion.HardModeRatings,
+    "doomtower": champion.DoomTowerRatings,
+}
+PAYLOAD_FIELDS = {
+    "name": "name", "title": "name", "championname": "name",
+    "faction": "faction", "affinity": "affinity", "rarity": "rarity",
+    "overall": "overall", "overallrating": "overall",
+    "book": "book", "bookvalue": "book",
+}
+PAYLOAD_LABELS = {
+    section: {champion_names.normalize_name(label): field for label, field in section.FIELDS}
+    for section in set(PAYLOAD_SECTIONS.values())
+}
+
+def _payload_number(value):
+    if isinstance(value, bool):
         return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r"-?\d+(\.\d+)?", value)
+        return float(match.group(0)) if match else None
+    return None
 
-    this_champion.ratings.hard_mode = getHardModeRatings(soup)
-    if not this_champion.ratings.hard_mode:
-        print("Warning: Hard mode ratings could not be determined.")
+def _walk_payload(node, found, section=None):
+    # Collects identity fields and section ratings from any nesting the site's JSON happens to use.
+    if isinstance(node, list):
+        for item in node:
+            _walk_payload(item, found, section)
+        return
+    if not isinstance(node, dict):
+        return
+    # {"label": "Demon Lord", "rating": 4.5} style items
+    label = node.get("label") or node.get("name")
+    if section is not None and isinstance(label, str):
+        value = next((node[k] for k in ("rating", "value", "stars", "score") if k in node), None)
+        _payload_rating(found, section, label, value)
+    for key, value in node.items():
+        key_name = champion_names.normalize_name(str(key))
+        if key_name in PAYLOAD_SECTIONS:
+            _walk_payload(value, found, PAYLOAD_SECTIONS[key_name])
+        elif section is None and key_name in PAYLOAD_FIELDS and not isinstance(value, (dict, list)):
+            found.setdefault(PAYLOAD_FIELDS[key_name], value)
+        elif isinstance(value, (dict, list)):
+            _walk_payload(value, found, section)
+        elif section is not None:
+            _payload_rating(found, section, str(key), value)
+
+def _payload_rating(found, section, label, value):
+    field = PAYLOAD_LABELS[section].get(champion_names.normalize_name(label))
+    number = _payload_number(value)
+    if field is not None and number is not None:
+        found.setdefault(section, {})[field] = number
+
+def load_from_payload(payload):
+    """Maps a structured ratings response (e.g. captured over DevTools) onto a Champion.
+
+    Returns None unless the payload carries a name, faction, affinity, a numeric overall rating
+    and every label of every rating section, so a partial or unrelated JSON response falls back to DOM parsing.
+    """
+    found = {}
+    _walk_payload(payload, found)
+    if not all(found.get(key) for key in ("name", "faction", "affinity")) or _payload_number(found.get("overall")) is None:
         return None
-
-    this_champion.ratings.doom_tower = getDoomTowerRatings(soup)
-    if not this_champion.ratings.doom_tower:
-        print("Warning: Doom tower ratings could not be determined.")
+    # A section missing any label would otherwise save its dataclass default (0.0) over a real rating
+    if not all(len(found.get(section, {})) == len(section.FIELDS) for _, section in champion.ChampionRatings.SECTIONS):
         return None
 
-    # this_champion.ratings.faction_wars = getFactionWarsRatings(soup)
-    # if not this_champion.ratings.faction_wars:
-    #     print("Warning: Faction wars ratings could not be determined.")
-    #     return None
+    this_champion = champion.Champion(
+        name=str(found["name"]).strip(),
+        faction=getFactionFromSource(str(found["faction"])) or str(found["faction"]),
+        affinity=getAffinityFromSource(str(found["affinity"]).lower()) or str(found["affinity"]),
+        rarity=str(found["rarity"]) if found.get("rarity") else None,
+    )
+    this_champion.ratings.overall = _payload_number(found["overall"])
+    book = _payload_number(found.get("book"))
+    this_champion.ratings.book = int(book) if book is not None else None
+    for attr, section in champion.ChampionRatings.SECTIONS:
+        setattr(this_champion.ratings, attr, section(**found[section]))
+    return this_champion
+
+def load_prefetched(this_champion):
+    # Parse step for fetchers that already return a Champion (see getPage.fetch_champion).
+    return this_champion
 
+def keep_sections(this_champion, sections):
+    # Drops everything outside sections, matching what build_champion(soup, sections) would have parsed.
+    this_champion.faction = this_champion.affinity = this_champion.rarity = None
+    if OVERALL_SECTION not in sections:
+        this_champion.ratings.overall = this_champion.ratings.book = None
+    for category, (attr, _, _, _) in RATING_SECTIONS.items():
+        if category not in sections:
+            setattr(this_champion.ratings, attr, None)
     return this_champion
@@ -1,43 +1,310 @@
 import getPage
 import loadChampion
+import champion_excel
 from champion_excel import ChampionExcel
 import os
+import argparse
+import functools
+import champion_export
+import champion_pipeline
+import champion_service
+import team_builder
+import champion_similarity
+import champion_jobs
+import champion_sources
+import champion_writer
 from champion_database import ChampionDatabase
 
-def scrape_and_load(db, xcel):
+def canonical_names(db, names):
+        # Spreadsheet spellings of stored champions ("ymir" for "Ýmir") map to the stored name; anything else is
+        # kept as written, since it may be a new champion.
+        index = db.name_index()
+        return [index.resolve(name) or name for name in names]
+
+def lookup(db, name):
+        # Exact (normalized) match only for query modes; near misses are offered, never substituted.
+        index = db.name_index()
+        resolved = index.resolve(name)
+        if resolved is None:
+            suggestions = index.suggest(name)
+            hint = f" Did you mean {', '.join(suggestions)}?" if suggestions else ""
+            print(f"Champion '{name}' is not in the database.{hint}")
+        return resolved
+
+def champion_names(db, roster_path):
+        # Every stored champion, plus any name added to the roster workbook that the database doesn't have yet.
+        # The roster is only read here; exports go to a separate file so they never overwrite a user's edits.
+        names = db.champion_names()
+        if os.path.exists(roster_path):
+            stored = set(names)
+            roster = canonical_names(db, ChampionExcel(file_path=roster_path).getChampionNames())
+            names += [name for name in dict.fromkeys(roster) if name not in stored]
+        return names
+
+def fetchers(capture=False, sections=None, base_url=None, record_dir=None):
+        # (fetch, parse) pair: either HTML then DOM parsing, or a Champion straight from the captured data feed.
+        # With sections, both only wait for and parse those sections. partial() keeps them picklable for --spawn.
+        options = {"sections": sections, "base_url": base_url}
+        if capture:
+            fetch, parse = getPage.fetch_champion, loadChampion.load_prefetched
+        else:
+            fetch, parse = getPage.get_hellhades_page, loadChampion.load_hell_Hades
+            options["record_dir"] = record_dir
+        options = {key: value for key, value in options.items() if value}
+        if options:
+            fetch = functools.partial(fetch, **options)
+        if sections and not capture:
+            parse = functools.partial(parse, sections=sections)
+        return fetch, parse
+
+def close_sinks(sinks):
+        # Closes every sink even if one fails, and returns the first failure instead of raising it, so a caller's
+        # finally block can't replace the exception that is already on its way out.
+        error = None
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"Failed to close {type(sink).__name__}: {e}")
+                error = error or e
+        return error
+
+def scrape_and_load(db, names, capture=False, sections=None, base_url=None, record_dir=None):
         #Debug:
-        names = ["Geomancer"]
-
-        names = xcel.getChampionNames()
-
-        for name in names:
-            print(f"Loading champion: {name}")
-            page = getPage.get_hellhades_page(name)
-
-            if page:
-                champion = loadChampion.load_hell_Hades(page)
-                if champion:
-                    print(f"Champion {champion.name} loaded successfully!")
-                    xcel.writeChampion(champion.toJson(as_dict=True))
-                    champion_id = db.save_champion(champion.toJson(as_dict=True))
-                    db.save_ratings(champion_id= champion_id, ratings_data=champion.toJson(as_dict=True)["Ratings"])
-                    print(f"Champion {champion.name} saved!")
+        #names = ["Geomancer"]
+
+        fetch, parse = fetchers(capture, sections, base_url, record_dir)
+        # Persistence happens on the writer thread, so the next page load starts while this one commits
+        writer = champion_writer.WriteBehindWriter(db.db_name, run_id=db.run_id)
+
+        try:
+            for name in names:
+                print(f"Loading champion: {name}")
+                page = fetch(name)
+
+                if page:
+                    champion = parse(page)
+                    if champion:
+                        print(f"Champion {champion.name} loaded successfully!")
+                        writer.write(champion.toRecord())
+                    else:
+                        print(f"Failed to load champion data for {name}")
                 else:
-                    print(f"Failed to load champion data for {name}")
-            else:
-                print(f"Failed to retrieve page for {name}")
+                    print(f"Failed to retrieve page for {name}")
+        finally:
+            error = close_sinks([writer])  # Everything queued is committed once this returns
+            print(f"Writer: {writer.stats()}")
+        if error is not None:
+            raise error
+
+def stream_and_load(db, names, fetch_workers=1, queue_size=4, jsonl=None, reparse=False, capture=False,
+                    sections=None, base_url=None, record_dir=None):
+        # Bounded-memory mode: pages flow through fixed-size queues and sinks write one record at a time.
+        sinks = [champion_writer.WriteBehindWriter(db.db_name, run_id=db.run_id)]
+        if jsonl:
+            sinks.append(champion_export.JsonLinesWriter(jsonl))
+        fetch, parse = fetchers(capture, sections, base_url, record_dir)
+        if reparse:
+            fetch, parse = champion_pipeline.read_saved_page, functools.partial(loadChampion.load_hell_Hades,
+                                                                                sections=sections)
+        pipeline = champion_pipeline.StreamingPipeline(sinks, fetch=fetch, parse=parse, fetch_workers=fetch_workers,
+                                                       queue_size=queue_size)
+        try:
+            stats = pipeline.run(names)
+        finally:
+            error = close_sinks(sinks)
+        if error is not None:
+            raise error
+        print(f"Streaming run finished: {stats}")
+        print(f"Writer: {sinks[0].stats()}")
+
+def sources_and_load(db, names, sources, browsers=1, rate=None, cache_dir=None, cache_ttl=None, queue_size=4,
+                     jsonl=None, tabs=1, tab_pages=50, tab_heap_mb=256):
+        # Every source shares one browser pool, rate limiter, page cache and set of sinks.
+        sinks = [champion_writer.WriteBehindWriter(db.db_name, run_id=db.run_id)]
+        if jsonl:
+            sinks.append(champion_export.JsonLinesWriter(jsonl))
+        cache = champion_sources.PageCache(cache_dir, cache_ttl) if cache_dir else None
+        # Several tabs per Chrome load pages concurrently for far less memory than a Chrome per page.
+        pool = (champion_sources.TabPool(browsers, tabs, tab_pages, tab_heap_mb) if tabs > 1
+                else champion_sources.BrowserPool(browsers))
+        engine = champion_sources.SourceEngine(sources, pool, champion_sources.RateLimiter(rate), cache)
+        try:
+            stats = engine.run(names, sinks, queue_size=queue_size)
+        finally:
+            error = close_sinks(sinks)
+        if error is not None:
+            raise error
+        print(f"Source run finished: {stats}")
+        print(f"Writer: {sinks[0].stats()}")
+
+# Options that only a --sources run uses, with the values they take when not given.
+SOURCE_DEFAULTS = {"browsers": 1, "tabs": 1, "tab_pages": 50, "tab_heap_mb": 256, "rate": None, "cache": None,
+                   "cache_ttl": None}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape ratings for Raid Shadow Legends Champions")
+    parser.add_argument("--jsonl", metavar="PATH", help="Write a JSON Lines snapshot (after the run, or incrementally when streaming)")
+    parser.add_argument("--stream", action="store_true", help="Bounded-memory streaming mode (skips the Excel sink)")
+    parser.add_argument("--reparse", metavar="DIR", help="Stream saved HTML pages from DIR instead of fetching")
+    parser.add_argument("--workers", type=int, help="Fetch workers in streaming mode (default 1)")
+    parser.add_argument("--queue-size", type=int, default=4, help="Capacity of each streaming queue")
+    parser.add_argument("--changes-since", type=int, metavar="RUN", help="Print rating changes after run RUN and exit")
+    parser.add_argument("--history", metavar="NAME", help="Print the rating history of a champion and exit")
+    parser.add_argument("--ranks", metavar="NAME", help="Print a champion's leaderboard ranks and percentiles and exit")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Serve the database as a local read-only JSON API")
+    parser.add_argument("--team", metavar="AREA", help='Print the best teams for an area, e.g. "Dungeons" or "Doom Tower:Dreadhorn"')
+    parser.add_argument("--team-size", type=int, default=5, help="Champions per team")
+    parser.add_argument("--teams", type=int, default=3, help="How many teams to print")
+    parser.add_argument("--roster", metavar="PATH", help="Text file of owned champion names, one per line")
+    parser.add_argument("--similar", metavar="NAME", help="Print the champions whose area ratings look most like NAME")
+    parser.add_argument("--k", type=int, default=5, help="Neighbours to print for --similar")
+    parser.add_argument("--enqueue", action="store_true", help="Queue every champion as a job for distributed workers")
+    parser.add_argument("--worker", action="store_true", help="Scrape queued jobs until the job table is drained")
+    parser.add_argument("--spawn", type=int, metavar="N", help="Run N local worker processes against the job table")
+    parser.add_argument("--jobs", metavar="PATH", default="output/jobs.db", help="Job table database (shared between workers)")
+    parser.add_argument("--lease", type=int, default=120, help="Job lease length in seconds")
+    parser.add_argument("--export-xlsx", action="store_true", help="Regenerate the Excel workbook from the database and exit")
+    parser.add_argument("--force", action="store_true", help="With --export-xlsx, rebuild even if nothing changed")
+    parser.add_argument("--capture", action="store_true",
+                        help="Read ratings from the page's data feed via DevTools, falling back to DOM parsing")
+    parser.add_argument("--sections", type=loadChampion.parse_sections, metavar="LIST",
+                        help=f'Only scrape these sections, e.g. "Doom Tower,Overall" (from {", ".join(loadChampion.SECTIONS)}); '
+                             "everything else keeps its stored value")
+    parser.add_argument("--record", metavar="DIR", help="Save every fetched page to DIR for replay by champion_mock")
+    parser.add_argument("--base-url", metavar="URL",
+                        help=f"Fetch champion pages from URL instead of {getPage.BASE_URL}, e.g. a champion_mock server")
+    parser.add_argument("--sources", type=lambda text: [name.strip() for name in text.split(",")], metavar="LIST",
+                        help=f"Scrape these rating sites through the shared source engine ({', '.join(champion_sources.SOURCES)})")
+    # Source engine options default to None so that using one without --sources can be rejected; see SOURCE_DEFAULTS.
+    parser.add_argument("--browsers", type=int, help="With --sources, Chrome instances shared by all sources (default 1)")
+    parser.add_argument("--tabs", type=int, help="With --sources, tabs loading pages at once in each browser (default 1)")
+    parser.add_argument("--tab-pages", type=int, help="With --tabs, pages a tab loads before it is replaced (default 50)")
+    parser.add_argument("--tab-heap-mb", type=int,
+                        help="With --tabs, JavaScript heap size at which a tab is replaced (default 256)")
+    parser.add_argument("--rate", type=float, help="With --sources, maximum page loads per second per host")
+    parser.add_argument("--cache", metavar="DIR", help="With --sources, reuse pages cached under DIR")
+    parser.add_argument("--cache-ttl", type=float, metavar="SECONDS", help="Age after which a cached page is refetched")
+    args = parser.parse_args()
+    unknown = [name for name in args.sources or () if name not in champion_sources.SOURCES]
+    if unknown:
+        parser.error(f"Unknown sources {unknown}; choose from {list(champion_sources.SOURCES)}")
+    if args.record and args.capture:
+        parser.error("--record saves rendered pages, which --capture does not fetch")
+    given = [f"--{option.replace('_', '-')}" for option in SOURCE_DEFAULTS if getattr(args, option) is not None]
+    if given and not args.sources:
+        parser.error(f"{', '.join(given)} can only be used with --sources")
+    ignored = [flag for flag, given in (("--record", args.record is not None), ("--capture", args.capture),
+                                        ("--stream", args.stream), ("--workers", args.workers is not None)) if given]
+    if ignored and args.sources:
+        parser.error(f"{', '.join(ignored)} cannot be used with --sources")
+    if (args.tab_pages is not None or args.tab_heap_mb is not None) and (args.tabs or 1) < 2:
+        parser.error("--tab-pages and --tab-heap-mb can only be used with --tabs 2 or more")
+    for option, default in SOURCE_DEFAULTS.items():
+        if getattr(args, option) is None:
+            setattr(args, option, default)
+    if args.workers is None:
+        args.workers = 1
+    return args
 
 def main():
+    args = parse_args()
     db_path = os.path.join(os.getcwd(), "output", "champions.db")  # Saves inside a "data" folder
-    excel_path = "output/raid_champions2.xlsx"
+    roster_path = "output/raid_champions2.xlsx"  # Edited by hand; new names here are scraped on the next run
+    excel_path = "output/raid_champions_export.xlsx"
+
+    if args.serve:
+        champion_service.serve(db_path, port=args.serve)
+        return
+
+    if args.worker or args.spawn:
+        fetch, parse = fetchers(args.capture, args.sections, args.base_url, args.record)
+        if args.spawn:
+            champion_jobs.spawn_workers(args.spawn, args.jobs, db_path, lease_seconds=args.lease, fetch=fetch, parse=parse)
+        else:
+            champion_jobs.run_worker(args.jobs, db_path, lease_seconds=args.lease, fetch=fetch, parse=parse)
+        print(f"Job table: {champion_jobs.JobQueue(args.jobs).counts()}")
+        return
 
     print("Champion Scraper is running!")
     db = ChampionDatabase(db_name=db_path)
-    xcel = ChampionExcel(file_path=excel_path)
 
     try:
-        scrape_and_load(db, xcel)
+        if args.team:
+            roster = None
+            if args.roster:
+                with open(args.roster, encoding="utf-8") as f:
+                    roster = [line.strip() for line in f if line.strip()]
+            builder = team_builder.TeamBuilder.from_database(db, roster=roster)
+            for team in builder.best_teams(team_builder.parse_target(args.team), args.team_size, args.teams):
+                print(f"{team['Score']:.2f}: {', '.join(team['Champions'])}")
+            return
+
+        if args.similar:
+            # Kept on disk and refreshed incrementally, so only champions changed since the last call are re-read.
+            name = lookup(db, args.similar)
+            if name is None:
+                return
+            index = champion_similarity.SimilarityIndex.cached(db, os.path.join(os.path.dirname(db_path),
+                                                                                "similarity.npz"))
+            for name, score in index.query([name], k=args.k)[name]:
+                print(f"{score:.3f}: {name}")
+            return
+
+        if args.ranks:
+            name = lookup(db, args.ranks)
+            for row in db.ranks(name) if name else ():
+                print(row)
+            return
+
+        if args.changes_since is not None or args.history:
+            if args.changes_since is not None:
+                rows = db.changes_since(args.changes_since)
+            else:
+                name = lookup(db, args.history)
+                rows = db.rating_history(name) if name else ()
+            for row in rows:
+                print(row)
+            return
+
+        if args.export_xlsx:
+            if champion_excel.export_database(db, excel_path, force=args.force):
+                print(f"Workbook regenerated at {excel_path}")
+            else:
+                print(f"Workbook at {excel_path} is already up to date")
+            return
+
+        if args.enqueue:
+            # The run stays open until the worker that finishes its last job closes it.
+            names = champion_names(db, roster_path)
+            queued = champion_jobs.JobQueue(args.jobs).enqueue(names, run_id=db.begin_run())
+            print(f"Queued {queued} champions for run {db.run_id}")
+            return
+
+        db.begin_run()
+        if args.reparse:
+            stream_and_load(db, champion_pipeline.saved_pages(args.reparse), args.workers, args.queue_size,
+                            jsonl=args.jsonl, reparse=True, sections=args.sections)
+        elif args.sources:
+            sources = [champion_sources.SOURCES[name](sections=args.sections, base_url=args.base_url)
+                       for name in args.sources]
+            sources_and_load(db, champion_names(db, roster_path), sources, args.browsers, args.rate, args.cache,
+                             args.cache_ttl, args.queue_size, jsonl=args.jsonl, tabs=args.tabs,
+                             tab_pages=args.tab_pages, tab_heap_mb=args.tab_heap_mb)
+        elif args.stream:
+            stream_and_load(db, champion_names(db, roster_path), args.workers, args.queue_size, jsonl=args.jsonl,
+                            capture=args.capture, sections=args.sections, base_url=args.base_url,
+                            record_dir=args.record)
+        else:
+            scrape_and_load(db, champion_names(db, roster_path), capture=args.capture, sections=args.sections,
+                            base_url=args.base_url, record_dir=args.record)
+        db.finish_run()
+        if champion_excel.export_database(db, excel_path):
+            print(f"Workbook regenerated at {excel_path}")
         db.pull_data('Core Areas', 'Demon Lord')  # Example of pulling data for Demon Lord champions
+        if args.jsonl and not (args.stream or args.reparse or args.sources):  # Streaming runs write the JSONL as they go
+            count = champion_export.export_jsonl(db.iter_records(), args.jsonl)
+            print(f"Exported {count} champions to {args.jsonl}")
     except Exception as e: 
         print(f"An error occurred: {e}")
     finally:
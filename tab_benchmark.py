@@ -0,0 +1,201 @@
+import argparse
+import itertools
+import threading
+import time
+import urllib.error
+import urllib.request
+from bs4 import BeautifulSoup
+import champion_mock
+import champion_sources
+import loadChampion
+
+try:
+    import psutil  # Optional: Chrome's memory in --chrome runs
+except ImportError:
+    psutil = None
+
+class _Document:
+    def __init__(self, html=""):
+        self.html = html
+        self.soup = BeautifulSoup(html, "html.parser")
+        self.stale = False
+
+class HttpDriver:
+    """Just enough of a Chrome WebDriver for TabbedBrowser, with pages fetched over plain HTTP.
+
+    get() returns at once and the page arrives on a background thread, as with
+    page_load_strategy "none", so tabs overlap their waits the way they do in Chrome.
+    Nothing is rendered, no scripts run and no memory is held, which makes it a measure
+    of the tab scheduling only; use --chrome for throughput and memory per GB.
+    """
+
+    _handles = itertools.count()
+
+    def __init__(self, options=None):
+        self.tabs = {}
+        self.current_window_handle = self._open()
+        self.switch_to = self._SwitchTo(self)
+
+    class _SwitchTo:
+        def __init__(self, driver):
+            self.driver = driver
+
+        def window(self, handle):
+            self.driver.current_window_handle = handle
+
+        def new_window(self, kind):
+            self.driver.current_window_handle = self.driver._open()
+
+    def _open(self):
+        handle = f"tab-{next(self._handles)}"
+        self.tabs[handle] = _Document()
+        return handle
+
+    def _document(self):
+        return self.tabs[self.current_window_handle]
+
+    def get(self, url):
+        handle = self.current_window_handle
+
+        def load():
+            try:
+                with urllib.request.urlopen(url) as response:
+                    html = response.read().decode("utf-8")
+            except urllib.error.HTTPError as e:
+                html = e.read().decode("utf-8")
+            if handle in self.tabs:  # The tab may have been recycled meanwhile
+                self.tabs[handle] = _Document(html)
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def execute_script(self, script):
+        document = self._document()
+        if script == "window.__championStale = true":
+            document.stale = True
+        elif "__championStale" in script:
+            return document.stale
+        elif "usedJSHeapSize" in script:
+            return 0
+        return None
+
+    @property
+    def title(self):
+        title = self._document().soup.title
+        return title.get_text() if title else ""
+
+    @property
+    def page_source(self):
+        return self._document().html
+
+    def find_elements(self, by, selector):
+        return self._document().soup.select(selector)
+
+    def close(self):
+        del self.tabs[self.current_window_handle]
+
+    def quit(self):
+        self.tabs.clear()
+
+def _tree_rss(pid):
+    # Resident memory of a process and all its descendants (chromedriver -> Chrome -> renderers, GPU, ...)
+    try:
+        processes = [psutil.Process(pid)]
+        processes += processes[0].children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass  # Exited between listing and reading
+    return total
+
+class _MemorySampler:
+    """Peak combined RSS of every Chrome a TabPool has running, sampled on a background thread."""
+
+    def __init__(self, pool, interval=0.25):
+        self.pool = pool
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            pids = [browser.driver.service.process.pid for browser in list(self.pool.browsers)
+                    if browser.driver is not None and browser.driver.service.process is not None]
+            self.peak = max(self.peak, sum(_tree_rss(pid) for pid in pids))
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+class _CountingSink:
+    def __init__(self):
+        self.records = 0
+
+    def write(self, record):
+        self.records += 1
+
+    def close(self):
+        pass
+
+def run(record_dir, tab_counts, pages=60, browsers=2, latency=0.2, jitter=0.05, seed=3, sections=None,
+        chrome=False):
+    """Scrapes pages champions from a champion_mock replay of record_dir once per tab count; returns one row each.
+
+    Each row is (tabs, seconds, pages saved, speedup over the first tab count, peak RSS in bytes). Memory is
+    only measured with chrome (and psutil installed), since HttpDriver holds no browser; it is None otherwise.
+    """
+    site = champion_mock.MockSite(record_dir, latency=latency, jitter=jitter, seed=seed)
+    server = champion_mock.make_server(site, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    names = list(itertools.islice(itertools.cycle(sorted(site.pages)), pages))  # Slugs are their own slugs
+    results = []
+    try:
+        for tabs in tab_counts:
+            pool = champion_sources.TabPool(browsers, tabs, max_pages=50, max_heap_mb=None,
+                                            driver_factory=None if chrome else HttpDriver)
+            engine = champion_sources.SourceEngine(
+                [champion_sources.HellHadesSource(sections=sections, base_url=base_url)], pool)
+            sink = _CountingSink()
+            sampler = _MemorySampler(pool) if chrome and psutil is not None else None
+            start = time.perf_counter()
+            try:
+                engine.run(names, [sink])  # Closes the pool, so the sampler's peak is taken while it ran
+            finally:
+                peak = sampler.stop() if sampler else None
+            elapsed = time.perf_counter() - start
+            results.append((tabs, elapsed, sink.records, results[0][1] / elapsed if results else 1.0, peak or None))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare tabs per browser for --sources runs against champion_mock")
+    parser.add_argument("record_dir", help="Directory of pages saved with main.py --record")
+    parser.add_argument("--tabs", type=lambda text: [int(part) for part in text.split(",")], default=[1, 6],
+                        metavar="LIST", help="Tab counts to compare, e.g. 1,3,6")
+    parser.add_argument("--pages", type=int, default=60, help="Pages per run (the recording is cycled)")
+    parser.add_argument("--browsers", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the mock adds to every page")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--sections", type=loadChampion.parse_sections, metavar="LIST",
+                        help="Only wait for these sections (skips the full page's settle time)")
+    parser.add_argument("--chrome", action="store_true", help="Drive real headless Chrome instead of HttpDriver")
+    args = parser.parse_args()
+    if args.chrome and psutil is None:
+        print("psutil is not installed; Chrome's memory won't be measured")
+    for tabs, elapsed, saved, speedup, rss in run(args.record_dir, args.tabs, args.pages, args.browsers,
+                                                  args.latency, args.jitter, args.seed, args.sections, args.chrome):
+        line = f"{tabs} tabs: {saved} pages in {elapsed:.2f}s ({saved / elapsed:.1f}/s, {speedup:.1f}x)"
+        if rss:
+            gb = rss / 1024 ** 3
+            line += f", peak RSS {rss / 1024 ** 2:.0f} MB, {saved / elapsed / gb:.1f} pages/s per GB"
+        print(line)
@@ -0,0 +1,172 @@
+import heapq
+import numpy as np
+import champion
+import champion_names
+
+class TeamBuilder:
+    """Best k-champion teams for an area, scored from a champion x subcategory ratings matrix.
+
+    A target is a category ("Dungeons", averaged over its subcategories), a
+    (category, subcategory) pair, or a list mixing both (averaged together).
+    """
+
+    def __init__(self, names, factions, affinities, rarities, matrix, columns=None):
+        self.names = np.asarray(names, dtype=object)
+        self.factions = np.asarray(factions, dtype=object)
+        self.affinities = np.asarray(affinities, dtype=object)
+        self.rarities = np.asarray(rarities, dtype=object)
+        self.matrix = np.asarray(matrix, dtype=np.float32)
+        self.columns = list(columns if columns is not None else champion.RATING_COLUMNS)
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+
+    @classmethod
+    def from_database(cls, db, roster=None, columns=None):
+        """Loads every champion's ratings in two queries; roster limits the matrix to owned champions."""
+        columns = list(columns if columns is not None else champion.RATING_COLUMNS)
+        column_index = {column: i for i, column in enumerate(columns)}
+        champions = db.conn.execute(
+            "SELECT champion_id, name, faction, affinity, rarity FROM champions ORDER BY name").fetchall()
+        if roster is not None:
+            names = champion_names.NameIndex(row[1] for row in champions)
+            owned = set()
+            for name in roster:
+                resolved = names.resolve(name)
+                if resolved is None:
+                    suggestions = names.suggest(name)
+                    hint = f" Did you mean {', '.join(suggestions)}?" if suggestions else ""
+                    print(f"Warning: Roster champion '{name}' is not in the database.{hint}")
+                else:
+                    owned.add(resolved)
+            champions = [row for row in champions if row[1] in owned]
+
+        row_index = {row[0]: i for i, row in enumerate(champions)}
+        matrix = np.zeros((len(champions), len(columns)), dtype=np.float32)
+        cells = [
+            (row_index[champion_id], column_index[(category, subcategory)], rating or 0.0)
+            for champion_id, category, subcategory, rating in db.conn.execute(
+                "SELECT champion_id, category, subcategory, rating FROM ratings")
+            if champion_id in row_index and (category, subcategory) in column_index
+        ]
+        if cells:
+            rows, cols, values = zip(*cells)
+            matrix[np.array(rows), np.array(cols)] = np.array(values, dtype=np.float32)
+
+        _, names, factions, affinities, rarities = zip(*champions) if champions else ((),) * 5
+        return cls(names, factions, affinities, rarities, matrix, columns)
+
+    def _target_columns(self, target):
+        targets = target if isinstance(target, list) else [target]
+        indices = []
+        for item in targets:
+            if isinstance(item, tuple):
+                if item not in self.column_index:
+                    raise ValueError(f"Unknown rating {item}")
+                indices.append(self.column_index[item])
+            else:
+                matches = [i for (category, _), i in self.column_index.items() if category == item]
+                if not matches:
+                    raise ValueError(f"Unknown rating category '{item}'")
+                indices.extend(matches)
+        return np.array(indices)
+
+    def scores(self, target):
+        """Per-champion score for a target: the mean of the targeted rating columns."""
+        return self.matrix[:, self._target_columns(target)].mean(axis=1)
+
+    def _mask(self, factions=None, affinities=None, rarities=None):
+        mask = np.ones(len(self.names), dtype=bool)
+        for values, allowed in ((self.factions, factions), (self.affinities, affinities), (self.rarities, rarities)):
+            if allowed:
+                mask &= np.isin(values, list(allowed))
+        return mask
+
+    def best_teams(self, target, size=5, n_teams=1, factions=None, affinities=None, rarities=None, limits=None):
+        """Returns up to n_teams best teams as {"Score", "Champions"} dicts, best first.
+
+        factions/affinities/rarities restrict who may be picked at all. limits caps how many
+        members may share a value, e.g. {"rarity": {"Legendary": 1}, "affinity": {"Void": 2}}.
+        """
+        limits = limits or {}
+        attribute_columns = {"faction": self.factions, "affinity": self.affinities, "rarity": self.rarities}
+        for attribute in limits:
+            if attribute not in attribute_columns:
+                raise ValueError(f"Cannot limit team members by '{attribute}'")
+        scores = self.scores(target)
+        candidates = np.flatnonzero(self._mask(factions, affinities, rarities))
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        # Champions with the same set of capped values are interchangeable with each other. A team holds at
+        # most m of a set (size, or the smallest of its caps), so once m + n_teams of a set have been seen,
+        # nobody ranked below them can be part of a top team.
+        caps = {(attribute, value): cap for attribute, values in limits.items() for value, cap in values.items()}
+        keep, seen = [], {}
+        for index in candidates:
+            keys = tuple((attribute, attribute_columns[attribute][index]) for attribute in limits
+                         if attribute_columns[attribute][index] in limits[attribute])
+            most = min([caps[key] for key in keys] + [size])
+            if seen.get(keys, 0) < most + n_teams:
+                seen[keys] = seen.get(keys, 0) + 1
+                keep.append((index, keys))
+        pool = np.array([index for index, _ in keep], dtype=np.intp)
+        group_keys = [keys for _, keys in keep]
+
+        # Each capped member uses up at least one cap, so uncapped members plus the caps (as far as the pool
+        # can fill them) bound how many champions can be picked from pool[i:].
+        uncapped_left = np.concatenate((np.cumsum([not keys for keys in group_keys][::-1])[::-1], [0]))
+        members_left = {key: np.concatenate((np.cumsum([key in keys for keys in group_keys][::-1])[::-1], [0]))
+                        for key in caps}
+
+        def capacity(start, counts):
+            return uncapped_left[start] + sum(
+                min(caps[key] - counts.get(key, 0), int(left[start])) for key, left in members_left.items())
+
+        if len(pool) < size or capacity(0, {}) < size:
+            return []
+
+        pool_scores = scores[pool].astype(np.float64)
+        # The pool is sorted best first, so prefix[i + r] - prefix[i] bounds what r more picks from pool[i:] can add.
+        prefix = np.concatenate(([0.0], np.cumsum(pool_scores)))
+
+        best = []  # Min-heap of (score, team) holding the n_teams best teams found so far
+        counts = {}
+        team = []
+
+        def search(start, total):
+            remaining = size - len(team)
+            if remaining == 0:
+                entry = (total, tuple(team))
+                if len(best) < n_teams:
+                    heapq.heappush(best, entry)
+                elif total > best[0][0]:
+                    heapq.heapreplace(best, entry)
+                return
+            for i in range(start, len(pool) - remaining + 1):
+                bound = total + prefix[i + remaining] - prefix[i]
+                if len(best) == n_teams and bound <= best[0][0]:
+                    return  # Sorted pool: no later start can do better either
+                if capacity(i, counts) < remaining:
+                    return  # The caps left can't fill the team from here on, or from any later start
+                keys = group_keys[i]
+                if any(counts.get(key, 0) >= caps[key] for key in keys):
+                    continue
+                for key in keys:
+                    counts[key] = counts.get(key, 0) + 1
+                team.append(i)
+                search(i + 1, total + pool_scores[i])
+                team.pop()
+                for key in keys:
+                    counts[key] -= 1
+
+        search(0, 0.0)
+        return [
+            {"Score": float(total), "Champions": [str(self.names[pool[i]]) for i in members]}
+            for total, members in sorted(best, reverse=True)
+        ]
+
+def parse_target(text):
+    """Parses "Dungeons" or "Doom Tower:Dreadhorn" (comma separated for several) into a best_teams target."""
+    targets = []
+    for part in text.split(","):
+        category, _, subcategory = part.strip().partition(":")
+        targets.append((category.strip(), subcategory.strip()) if subcategory else category.strip())
+    return targets if len(targets) > 1 else targets[0]
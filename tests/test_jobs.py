@@ -0,0 +1,95 @@
+import pytest
+import champion_jobs
+from champion_jobs import JobQueue
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(champion_jobs.time, "time", clock)
+    return clock
+
+@pytest.fixture
+def job_db(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+@pytest.fixture
+def queues(job_db):
+    """Two workers' connections to one job table, as separate processes would have."""
+    opened = []
+
+    def open_queue(**options):
+        queue = JobQueue(job_db, **{"lease_seconds": 10, **options})
+        opened.append(queue)
+        return queue
+
+    yield open_queue
+    for queue in opened:
+        queue.close()
+
+def test_expired_lease_is_reclaimed(clock, queues):
+    first, second = queues(), queues()
+    first.enqueue(["Arbiter"], run_id=7)
+    assert first.claim("a") == ("Arbiter", 7)
+    assert second.claim("b") is None  # Leased to a
+
+    clock.now += 11
+    assert second.claim("b") == ("Arbiter", 7)
+    assert not first.heartbeat("Arbiter", "a")  # a's lease is gone; it must not save the job
+    assert not first.complete("Arbiter", "a")
+    assert second.complete("Arbiter", "b")
+    assert first.counts() == {"done": 1}
+    assert first.remaining(7) == 0
+
+def test_heartbeat_extends_the_lease(clock, queues):
+    first, second = queues(), queues()
+    first.enqueue(["Arbiter"])
+    first.claim("a")
+    clock.now += 8
+    assert first.heartbeat("Arbiter", "a")  # Now expires at 18s instead of 10s
+    clock.now += 7
+    assert second.claim("b") is None
+    clock.now += 4
+    assert second.claim("b") == ("Arbiter", None)
+
+def test_fail_retries_until_max_attempts(clock, queues):
+    queue = queues(max_attempts=2)
+    queue.enqueue(["Arbiter", "Siphi"])
+    name, _ = queue.claim("a")
+    assert name == "Arbiter"
+    queue.fail(name, "a", "fetch failed")
+    assert queue.claim("a") == ("Siphi", None)  # Fewest attempts first
+    queue.complete("Siphi", "a")
+    assert queue.claim("a") == ("Arbiter", None)
+    queue.fail("Arbiter", "a", "parse failed")
+    assert queue.claim("a") is None
+    assert queue.counts() == {"done": 1, "failed": 1}
+    assert queue.remaining() == 0
+    assert queue.conn.execute("SELECT attempts, last_error FROM jobs WHERE name = 'Arbiter'").fetchone() == (
+        2, "parse failed")
+
+def test_expired_leases_count_as_attempts(clock, queues):
+    queue = queues(max_attempts=2)
+    queue.enqueue(["Arbiter"])
+    for worker in ("a", "b"):  # Both workers die holding the lease
+        assert queue.claim(worker) == ("Arbiter", None)
+        clock.now += 11
+    assert queue.claim("c") is None
+    assert queue.counts() == {"failed": 1}
+    assert queue.conn.execute("SELECT last_error FROM jobs").fetchone() == ("lease expired 2 times",)
+
+def test_enqueue_reopens_jobs(clock, queues):
+    queue = queues(max_attempts=1)
+    queue.enqueue(["Arbiter"], run_id=1)
+    queue.claim("a")
+    queue.fail("Arbiter", "a", "fetch failed")
+    assert queue.counts() == {"failed": 1}
+    queue.enqueue(["Arbiter"], run_id=2)
+    assert queue.runs() == [2]
+    assert queue.claim("a") == ("Arbiter", 2)
@@ -0,0 +1,73 @@
+import random
+import pytest
+from champion_database import ChampionDatabase
+
+COLUMNS = [("Overall", "Overall Rating"), ("Dungeons", "Spider"), ("Dungeons", "Dragon"), ("Doom Tower", "Scarab King")]
+AFFINITIES = ["Magic", "Force", "Spirit", "Void"]
+RARITIES = ["Rare", "Epic", "Legendary"]
+
+def snapshot(db):
+    return db.conn.execute("SELECT * FROM leaderboard ORDER BY champion_id, category, subcategory, scope").fetchall()
+
+def rebuilt(db):
+    """The leaderboard a full rebuild would produce, without keeping it."""
+    db.refresh_leaderboards(commit=False)
+    rows = snapshot(db)
+    db.conn.rollback()
+    return rows
+
+def save(db, name, rng, rarity=None, affinity=None, columns=COLUMNS):
+    champion_id = db.save_champion({"Name": name, "Faction": "Dark Elves", "Affinity": affinity, "Rarity": rarity},
+                                   commit=False)
+    db.save_rows(champion_id, [(category, subcategory, rng.randint(0, 10) / 2) for category, subcategory in columns])
+
+@pytest.fixture
+def db(tmp_path):
+    db = ChampionDatabase(str(tmp_path / "champions.db"))
+    yield db
+    db.close()
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_refresh_matches_full_rebuild(db, seed):
+    rng = random.Random(seed)
+    names = [f"Champion {i}" for i in range(25)]
+
+    db.begin_run()
+    for name in names:
+        save(db, name, rng, rng.choice(RARITIES), rng.choice(AFFINITIES))
+    db.finish_run()
+    assert snapshot(db) == rebuilt(db)
+
+    # Rating changes, plus champions that only moved rarity or affinity
+    db.begin_run()
+    for name in rng.sample(names, 5):
+        save(db, name, rng, columns=rng.sample(COLUMNS, 2))
+    for name in rng.sample(names, 3):
+        db.save_champion({"Name": name, "Faction": None, "Affinity": None, "Rarity": rng.choice(RARITIES)})
+    for name in rng.sample(names, 3):
+        db.save_champion({"Name": name, "Faction": None, "Affinity": rng.choice(AFFINITIES), "Rarity": None})
+    save(db, "Newcomer", rng, "Legendary", "Void")
+    db.finish_run()
+    assert snapshot(db) == rebuilt(db)
+
+    # A run that dies before finish_run(): its changes are picked up by the next run's refresh
+    db.begin_run()
+    for name in rng.sample(names, 4):
+        save(db, name, rng)
+    db.run_id = None
+    db.begin_run()
+    save(db, rng.choice(names), rng, columns=[("Overall", "Overall Rating")])
+    db.finish_run()
+    assert snapshot(db) == rebuilt(db)
+
+def test_ranks_and_percentiles(db):
+    db.begin_run()
+    for name, rating in (("A", 5.0), ("B", 4.0), ("C", 4.0), ("D", 1.0)):
+        champion_id = db.save_champion({"Name": name, "Faction": None, "Affinity": "Void", "Rarity": "Epic"},
+                                       commit=False)
+        db.save_rows(champion_id, [("Overall", "Overall Rating", rating)])
+    db.finish_run()
+    ranks = {name: (rank, total, percentile) for name, rank, total, percentile in db.conn.execute("""
+        SELECT name, rank, total, percentile FROM leaderboard JOIN champions USING (champion_id) WHERE scope = 'all'
+    """)}
+    assert ranks == {"A": (1, 4, 100.0), "B": (2, 4, 75.0), "C": (2, 4, 75.0), "D": (4, 4, 25.0)}
@@ -0,0 +1,71 @@
+import itertools
+import numpy as np
+import pytest
+from team_builder import TeamBuilder, parse_target
+
+COLUMNS = [("Dungeons", "Spider"), ("Dungeons", "Dragon"), ("Doom Tower", "Scarab King"), ("Overall", "Overall Rating")]
+FACTIONS = ["Banner Lords", "Dark Elves", "Undead Hordes"]
+AFFINITIES = ["Magic", "Force", "Spirit", "Void"]
+RARITIES = ["Rare", "Epic", "Legendary"]
+
+def make_builder(count, seed):
+    rng = np.random.default_rng(seed)
+    return TeamBuilder(
+        [f"Champion {i}" for i in range(count)],
+        rng.choice(FACTIONS, count), rng.choice(AFFINITIES, count), rng.choice(RARITIES, count),
+        rng.integers(0, 11, (count, len(COLUMNS))) / 2,  # Half-point ratings, so ties are common
+        COLUMNS,
+    )
+
+def brute_force(builder, target, size, n_teams, limits):
+    scores = builder.scores(target).astype(np.float64)
+    columns = {"faction": builder.factions, "affinity": builder.affinities, "rarity": builder.rarities}
+    totals = []
+    for team in itertools.combinations(range(len(builder.names)), size):
+        if all(sum(columns[attribute][i] == value for i in team) <= cap
+               for attribute, caps in limits.items() for value, cap in caps.items()):
+            totals.append(sum(scores[i] for i in team))
+    return sorted(totals, reverse=True)[:n_teams]
+
+def check_team(builder, target, team, size, limits):
+    index = {name: i for i, name in enumerate(builder.names)}
+    members = [index[name] for name in team["Champions"]]
+    columns = {"faction": builder.factions, "affinity": builder.affinities, "rarity": builder.rarities}
+    assert len(set(members)) == size
+    assert team["Score"] == pytest.approx(sum(float(builder.scores(target)[i]) for i in members))
+    for attribute, caps in limits.items():
+        for value, cap in caps.items():
+            assert sum(columns[attribute][i] == value for i in members) <= cap
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("limits", [
+    {},
+    {"rarity": {"Legendary": 1}},
+    {"rarity": {"Legendary": 1, "Epic": 2}, "affinity": {"Void": 1}},
+    {"faction": {"Dark Elves": 0}, "affinity": {"Magic": 1, "Force": 1}},
+])
+def test_best_teams_match_brute_force(seed, limits):
+    builder = make_builder(14, seed)
+    for target in ("Dungeons", ("Doom Tower", "Scarab King"), ["Dungeons", ("Overall", "Overall Rating")]):
+        teams = builder.best_teams(target, size=4, n_teams=3, limits=limits)
+        assert [team["Score"] for team in teams] == pytest.approx(brute_force(builder, target, 4, 3, limits))
+        for team in teams:
+            check_team(builder, target, team, 4, limits)
+
+def test_best_teams_infeasible_caps_return_nothing():
+    builder = make_builder(10, 0)
+    caps = {"rarity": {rarity: 1 for rarity in RARITIES}}  # At most three members whatever the roster
+    assert builder.best_teams("Dungeons", size=4, limits=caps) == []
+    assert brute_force(builder, "Dungeons", 4, 1, caps) == []
+
+def test_best_teams_rejects_unknown_limits_and_targets():
+    builder = make_builder(6, 0)
+    with pytest.raises(ValueError):
+        builder.best_teams("Dungeons", limits={"role": {"Support": 1}})
+    with pytest.raises(ValueError):
+        builder.best_teams("Clan Boss")
+
+def test_parse_target():
+    assert parse_target("Dungeons") == "Dungeons"
+    assert parse_target("Doom Tower:Dreadhorn") == ("Doom Tower", "Dreadhorn")
+    assert parse_target("Dungeons, Doom Tower:Dreadhorn") == ["Dungeons", ("Doom Tower", "Dreadhorn")]